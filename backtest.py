@@ -0,0 +1,288 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import groupby
+
+import numpy as np
+
+from cache import SimCache
+from lays import lay_board, rank_and_size, signal_index, SIGNALS
+from parallel import get_pool, seed_sequence
+from scoring import (to_columns, score_players, load_calibration, _guess_format, SIM_MODES,
+                     DEFAULT_SIMS, CALIBRATION_PATH)
+from store import SnapshotStore
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+BANKROLL    = 1000.0    # bankroll the lay stakes are sized against (not compounded)
+COMMISSION  = 0.0       # exchange commission on winning lays
+CAL_BINS    = np.array([0, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0])
+MAX_INFLIGHT = 4        # queued events per worker (bounds memory while streaming)
+
+EVENT_FIELD = "event"
+TIME_FIELD  = "timestamp"
+OUTCOME_FIELD = "won"
+
+_CACHE = None           # per-process base SimCache (warm start + earlier unseeded events)
+_CALIBRATION = None     # calibration file loaded into this process's scoring module
+
+# ------------------------
+# STREAMING INPUT
+# ------------------------
+
+def iter_snapshots(fh, fmt: str):
+    """Lazily yield snapshot dicts from a CSV or JSONL stream."""
+    if fmt == "csv":
+        yield from csv.DictReader(fh)
+    else:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_events(snapshots):
+    """
+    Group a snapshot stream into (event, rows). Rows of one event must be
+    contiguous (files are written event by event), so only one event is
+    held in memory at a time.
+    """
+    for event, rows in groupby(snapshots, key=lambda r: r[EVENT_FIELD]):
+        yield event, list(rows)
+
+# ------------------------
+# PER-EVENT REPLAY
+# ------------------------
+
+def _worker_cache(cache_path):
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = SimCache(path=cache_path)
+    return _CACHE
+
+
+def _worker_calibration(path):
+    """Load the calibration in this process (spawned workers start from the defaults)."""
+    global _CALIBRATION
+    if path != _CALIBRATION:
+        load_calibration(path)
+        _CALIBRATION = path
+
+
+def backtest_event(rows, bank, mode, sims, method, seed_seq, cache_path=None, seeded=False,
+                   calibration=CALIBRATION_PATH):
+    """
+    Replay one event: at every timestamp the board (each player's latest
+    snapshot so far) is priced by score_players and staked by rank_and_size;
+    signalled lays on players updated at that timestamp are settled on the
+    outcome. Returns the bets (in time order), calibration bin sums for the
+    updated rows and the simulation-cache entries this event priced.
+
+    Each event prices into its own cache layered over the process cache. A
+    seeded run never adds to the process cache, so results do not depend on
+    which worker replayed which events before; unseeded runs share entries
+    across the events a worker sees.
+    """
+    _worker_calibration(calibration)
+    rng   = np.random.default_rng(seed_seq)
+    # exact/grid price a whole board in one vectorized call; only the
+    # stochastic engines are worth memoizing per state
+    cache = SimCache(parent=_worker_cache(cache_path)) if mode in ("mc", "holes") else None
+    bets  = {k: [] for k in ("signal", "p_final", "p_implied", "won", "liability", "pnl")}
+    cal   = np.zeros((3, len(CAL_BINS) - 1))      # Σp, Σwon, n per bin
+    loss  = 0.0
+
+    latest = {}                                   # name → last snapshot row as of now
+    for _, fresh in groupby(rows, key=lambda r: r.get(TIME_FIELD)):
+        fresh = list(fresh)
+        for r in fresh:
+            latest.pop(r["name"], None)
+            latest[r["name"]] = r
+        # A stored batch may hold only the players that were repriced, so the
+        # board is every player's latest row; only the fresh rows are scored
+        # for calibration and can trigger a lay.
+        board_rows = list(latest.values())
+        updated = np.arange(len(board_rows) - len({r["name"] for r in fresh}), len(board_rows))
+        won = np.array([float(r[OUTCOME_FIELD]) for r in board_rows])
+        res = score_players(to_columns(board_rows), mode=mode, sims=sims, rng=rng,
+                            cache=cache, method=method)
+        p = res["p_final"]
+        pu, wu = p[updated], won[updated]
+        b = np.clip(np.searchsorted(CAL_BINS, pu, side="right") - 1, 0, len(CAL_BINS) - 2)
+        np.add.at(cal, (0, b), pu)
+        np.add.at(cal, (1, b), wu)
+        np.add.at(cal, (2, b), 1)
+        pc = np.clip(pu, 1e-12, 1 - 1e-12)
+        loss -= float(np.sum(wu * np.log(pc) + (1 - wu) * np.log1p(-pc)))
+
+        board = lay_board(res)
+        lays  = rank_and_size(board["odds"], board["model_p"], bank)
+        sig   = signal_index(lays["delta"])
+        hit   = updated[sig[updated] > 0]
+        pnl   = np.where(won[hit] > 0, -lays["liability"][hit],
+                         lays["stake"][hit] * (1 - COMMISSION))
+        bets["signal"].append(sig[hit])
+        bets["p_final"].append(p[hit])
+        bets["p_implied"].append(res["p_implied"][hit])
+        bets["won"].append(won[hit])
+        bets["liability"].append(lays["liability"][hit])
+        bets["pnl"].append(pnl)
+
+    bets = {k: np.concatenate(v) if v else np.empty(0) for k, v in bets.items()}
+    items = cache.state()["items"] if cache is not None else []
+    if cache is not None and not seeded:
+        _CACHE.restore(cache.state())
+    return {"bets": bets, "cal": cal, "log_loss_sum": loss, "cache_items": items}
+
+
+def run(events, bank=BANKROLL, mode="exact", sims=DEFAULT_SIMS, method="plain",
+        seed=None, workers=1, cache_path=None, calibration=CALIBRATION_PATH):
+    """
+    Replay an (event, rows) stream, in-process for one worker or across the
+    persistent process pool otherwise. Each event gets its own spawned seed;
+    results come back in stream order so drawdown follows event order.
+    With a seed the output is the same for any worker count. Entries priced
+    by every worker are merged into `cache_path` at the end.
+    """
+    root = seed_sequence(seed)
+    jobs = ((rows, bank, mode, sims, method,
+             np.random.SeedSequence(root.entropy, spawn_key=(i,)), cache_path, seed is not None,
+             calibration)
+            for i, (_, rows) in enumerate(events))
+    merged = SimCache(path=cache_path) if cache_path and mode in ("mc", "holes") else None
+
+    def collect(result):
+        items = result.pop("cache_items")
+        if merged is not None:
+            merged.restore({"resolution": merged.resolution, "items": items})
+        return result
+
+    if workers is not None and workers <= 1:
+        for job in jobs:
+            yield collect(backtest_event(*job))
+    else:
+        pool = get_pool(workers)
+        limit = MAX_INFLIGHT * (workers or os.cpu_count() or 1)
+        inflight = deque()
+        for job in jobs:
+            inflight.append(pool.submit(backtest_event, *job))
+            if len(inflight) >= limit:
+                yield collect(inflight.popleft().result())
+        while inflight:
+            yield collect(inflight.popleft().result())
+    if merged is not None:
+        merged.save()
+
+# ------------------------
+# REPORTING
+# ------------------------
+
+def summarise(results, bank=BANKROLL):
+    """ROI, hit rate, drawdown and calibration by signal from run() output."""
+    parts = {k: [] for k in ("signal", "p_final", "p_implied", "won", "liability", "pnl")}
+    cal, loss, events = np.zeros((3, len(CAL_BINS) - 1)), 0.0, 0
+    for r in results:
+        for k in parts:
+            parts[k].append(r["bets"][k])
+        cal += r["cal"]
+        loss += r["log_loss_sum"]
+        events += 1
+    bets = {k: np.concatenate(v) if v else np.empty(0) for k, v in parts.items()}
+
+    def stats(mask):
+        n = int(mask.sum())
+        risked = float(bets["liability"][mask].sum())
+        pnl = float(bets["pnl"][mask].sum())
+        return {
+            "bets":         n,
+            "liability":    risked,
+            "pnl":          pnl,
+            "roi":          pnl / risked if risked else float("nan"),
+            "hit_rate":     float(np.mean(bets["won"][mask] == 0)) if n else float("nan"),
+            "mean_p_model": float(bets["p_final"][mask].mean()) if n else float("nan"),
+            "mean_p_mkt":   float(bets["p_implied"][mask].mean()) if n else float("nan"),
+            "win_rate":     float(bets["won"][mask].mean()) if n else float("nan"),
+        }
+
+    curve = np.cumsum(bets["pnl"])
+    drawdown = float(np.max(np.maximum.accumulate(np.append(0.0, curve))[1:] - curve)) \
+        if len(curve) else 0.0
+    rows = int(cal[2].sum())
+    return {
+        "events":       events,
+        "snapshots":    rows,
+        "log_loss":     loss / rows if rows else float("nan"),
+        "max_drawdown": drawdown,
+        "max_drawdown_frac": drawdown / bank,
+        "overall":      stats(np.ones(len(bets["pnl"]), bool)),
+        "by_signal":    {str(SIGNALS[i]): stats(bets["signal"] == i) for i in range(1, len(SIGNALS))},
+        "calibration":  [
+            {"bin": f"{lo:.2f}-{hi:.2f}", "n": int(n),
+             "mean_p": s_p / n if n else float("nan"), "win_rate": s_y / n if n else float("nan")}
+            for lo, hi, s_p, s_y, n in zip(CAL_BINS[:-1], CAL_BINS[1:], *cal)
+        ],
+    }
+
+
+def format_report(rep) -> str:
+    lines = [f"{rep['events']} events, {rep['snapshots']} snapshots, "
+             f"log-loss {rep['log_loss']:.5f}, max drawdown {rep['max_drawdown']:.2f} "
+             f"({rep['max_drawdown_frac']:.1%} of bank)",
+             "{:<9}{:>8}{:>12}{:>11}{:>8}{:>8}{:>8}{:>8}{:>8}".format(
+                 "Signal", "Bets", "Liability", "P&L", "ROI", "Hit%", "Md%", "Mk%", "Won%")]
+    for name, s in [*rep["by_signal"].items(), ("All", rep["overall"])]:
+        lines.append("{:<9}{:>8d}{:>12.2f}{:>11.2f}{:>8.2%}{:>8.2%}{:>8.2f}{:>8.2f}{:>8.2f}".format(
+            name, s["bets"], s["liability"], s["pnl"], s["roi"], s["hit_rate"],
+            s["mean_p_model"] * 100, s["mean_p_mkt"] * 100, s["win_rate"] * 100))
+    lines.append("Calibration (all snapshots): " + "  ".join(
+        f"{c['bin']}: {c['mean_p']:.3f}/{c['win_rate']:.3f} (n={c['n']})"
+        for c in rep["calibration"] if c["n"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay historical snapshots through the model and lay rules.")
+    parser.add_argument("input", help="snapshots CSV/JSONL with event, timestamp and won "
+                                      "columns, or a .snap snapshot store")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"])
+    parser.add_argument("--bank", type=float, default=BANKROLL)
+    parser.add_argument("--mode", choices=SIM_MODES, default="exact",
+                        help="win-prob engine (mc/holes use the simulation cache)")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--method", default="plain")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=1, help="processes (0 = all cores)")
+    parser.add_argument("--cache", help="simulation cache file to warm-start from and save to")
+    parser.add_argument("--calibration", default=CALIBRATION_PATH,
+                        help="fitted calibration config (used if it exists)")
+    parser.add_argument("-o", "--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    def replay(events):
+        return summarise(run(events, args.bank, args.mode, args.sims, args.method,
+                             args.seed, args.workers or None, args.cache, args.calibration),
+                         args.bank)
+
+    if args.input.endswith(".snap"):
+        rep = replay(SnapshotStore(args.input).iter_events())
+    else:
+        fmt = args.in_format or _guess_format(args.input, "csv")
+        fin = sys.stdin if args.input == "-" else open(args.input, newline="")
+        with fin:
+            rep = replay(iter_events(iter_snapshots(fin, fmt)))
+    rep["seconds"] = time.perf_counter() - t0
+    print(format_report(rep))
+    print(f"[{rep['seconds']:.1f}s]")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(rep, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from simulation import simulate_win_prob
+from scoring import score_players, NUMERIC_FIELDS
+from lays import lay_board, rank_and_size, format_table
+from portfolio import kelly_portfolio
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+SIM_SIMS       = [10**3, 10**4, 10**5, 10**6]
+SIM_CONTENDERS = [5, 20, 156]
+SIM_HOLES      = [1, 18, 72]
+SCORE_FIELDS   = [20, 156, 1000]
+LAY_BOARDS     = [20, 156, 1000, 5000]
+
+MIN_REPEATS = 3
+MIN_TIME    = 0.5     # seconds of timed repeats per case (after MIN_REPEATS)
+MAX_REPEATS = 200
+
+# ------------------------
+# SYNTHETIC INPUTS
+# ------------------------
+
+def synthetic_field(n: int, rng: np.random.Generator):
+    """Column table shaped like scoring.to_columns output for `n` players."""
+    cols = {f: rng.normal(0, 1, n) for f in NUMERIC_FIELDS}
+    cols.update({
+        "xwins":           rng.uniform(0, 5, n),
+        "course_fit":      rng.uniform(0, 1, n),
+        "ranking":         rng.integers(1, 300, n).astype(float),
+        "live_odds":       rng.uniform(3, 500, n),
+        "leaderboard_pos": np.arange(1, n + 1, dtype=float),
+        "shots_behind":    np.sort(rng.integers(0, 12, n)).astype(float),
+        "scrambling":      rng.uniform(40, 80, n),
+        "holes_left":      np.full(n, 36.0),
+        "n_contenders":    np.full(n, 20.0),
+    })
+    for i in range(1, 6):
+        cols[f"finish{i}"] = rng.integers(1, 70, n).astype(float)
+    cols["name"]    = [f"P{i}" for i in range(n)]
+    cols["quality"] = ["average"] * n
+    return cols
+
+
+def synthetic_board(n: int, rng: np.random.Generator):
+    """Priced-board columns (interchange layout) for `n` runners."""
+    p = rng.dirichlet(np.ones(n)) * 0.95
+    odds = 1.0 / np.clip(p * np.exp(rng.normal(0, 0.3, n)), 1e-3, 0.9)
+    return {
+        "name":      np.array([f"P{i}" for i in range(n)]),
+        "score":     rng.uniform(0, 100, n),
+        "p_final":   p,
+        "p_implied": 1.0 / odds,
+        "live_odds": odds,
+        "ev":        p * (odds - 1) - (1 - p),
+    }
+
+# ------------------------
+# MEASUREMENT
+# ------------------------
+
+def measure(fn, units: float, min_time: float = MIN_TIME):
+    """
+    Time repeated calls of `fn` and measure its peak traced memory once.
+    Returns latency percentiles (ms), throughput (units/s) and peak MB.
+    """
+    fn()                                   # warm-up
+    times = []
+    start = time.perf_counter()
+    while len(times) < MIN_REPEATS or (time.perf_counter() - start < min_time
+                                       and len(times) < MAX_REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    t = np.array(times)
+    return {
+        "repeats":    len(t),
+        "p50_ms":     float(np.percentile(t, 50) * 1e3),
+        "p90_ms":     float(np.percentile(t, 90) * 1e3),
+        "p99_ms":     float(np.percentile(t, 99) * 1e3),
+        "mean_ms":    float(t.mean() * 1e3),
+        "throughput": float(units / np.median(t)),
+        "peak_mb":    peak / 1e6,
+    }
+
+# ------------------------
+# SUITES
+# ------------------------
+
+def bench_sim(quick: bool, min_time: float):
+    sims_list = SIM_SIMS[:3] if quick else SIM_SIMS
+    for sims in sims_list:
+        for n in SIM_CONTENDERS:
+            for holes in SIM_HOLES:
+                rng = np.random.default_rng(0)
+                fn = lambda: simulate_win_prob(2.0, holes, 0.5, contenders=n, sims=sims, rng=rng)
+                yield {"case": "simulate_win_prob", "sims": sims, "contenders": n,
+                       "holes_left": holes, "unit": "sims/s", **measure(fn, sims, min_time)}
+    for n in SIM_CONTENDERS:
+        fn = lambda: simulate_win_prob(2.0, 18, 0.5, contenders=n, mode="exact")
+        yield {"case": "simulate_win_prob[exact]", "contenders": n, "unit": "calls/s",
+               **measure(fn, 1, min_time)}
+
+
+def bench_score(quick: bool, min_time: float):
+    for n in SCORE_FIELDS[:2] if quick else SCORE_FIELDS:
+        cols = synthetic_field(n, np.random.default_rng(1))
+        for mode in ("mc", "exact"):
+            rng = np.random.default_rng(2)
+            fn = lambda: score_players(cols, mode=mode, rng=rng)
+            yield {"case": f"score_players[{mode}]", "players": n, "unit": "players/s",
+                   **measure(fn, n, min_time)}
+
+
+def bench_lays(quick: bool, min_time: float):
+    for n in LAY_BOARDS[:3] if quick else LAY_BOARDS:
+        board = lay_board(synthetic_board(n, np.random.default_rng(3)))
+        fn = lambda: rank_and_size(board["odds"], board["model_p"], 1000.0)
+        yield {"case": "rank_and_size", "runners": n, "unit": "runners/s",
+               **measure(fn, n, min_time)}
+        fn = lambda: format_table(board, rank_and_size(board["odds"], board["model_p"], 1000.0))
+        yield {"case": "calculate_lays", "runners": n, "unit": "runners/s",
+               **measure(fn, n, min_time)}
+        fn = lambda: kelly_portfolio(board["model_p"] / 100, board["odds"], 1000.0)
+        yield {"case": "kelly_portfolio", "runners": n, "unit": "runners/s",
+               **measure(fn, n, min_time)}
+
+
+SUITES = {"sim": bench_sim, "score": bench_score, "lays": bench_lays}
+
+# ------------------------
+# REPORTING
+# ------------------------
+
+def _case_key(r):
+    return tuple(sorted((k, v) for k, v in r.items()
+                        if k in ("case", "sims", "contenders", "holes_left", "players", "runners")))
+
+
+def _label(r):
+    return " ".join(f"{k}={v}" for k, v in _case_key(r) if k != "case")
+
+
+def compare(results, baseline):
+    """Lines comparing p50 latency against a previous run's results."""
+    old = {_case_key(r): r for r in baseline["results"]}
+    lines = []
+    for r in results:
+        b = old.get(_case_key(r))
+        if b:
+            ratio = r["p50_ms"] / b["p50_ms"] if b["p50_ms"] else float("nan")
+            flag = "  REGRESSION" if ratio > 1.10 else ""
+            lines.append(f"{r['case']:<26}{_label(r):<44}{b['p50_ms']:>10.3f} → "
+                         f"{r['p50_ms']:>10.3f} ms  ×{ratio:5.2f}{flag}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pricing and lay-sizing hot paths.")
+    parser.add_argument("--suite", default="sim,score,lays",
+                        help="comma-separated suites: " + ",".join(SUITES))
+    parser.add_argument("--quick", action="store_true", help="skip the largest cases")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.suite.split(","):
+        for r in SUITES[name](args.quick, args.min_time):
+            results.append(r)
+            print(f"{r['case']:<26}{_label(r):<44}p50 {r['p50_ms']:>10.3f} ms  "
+                  f"p99 {r['p99_ms']:>10.3f} ms  {r['throughput']:>12.4g} {r['unit']}  "
+                  f"{r['peak_mb']:>7.1f} MB", flush=True)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python":    sys.version.split()[0],
+        "numpy":     np.__version__,
+        "machine":   platform.platform(),
+        "results":   results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            print("\n".join(compare(results, json.load(fh))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from simulation import simulate_win_prob, DEFAULT_SIMS, DEFAULT_RND_SD
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+CACHE_MAXSIZE = 100_000   # entries kept before LRU eviction
+
+# Quantization step per input (inputs are snapped to a multiple of the step)
+DEFAULT_RESOLUTION = {
+    "shots_behind":    0.1,
+    "holes_left":      1,
+    "sg_expect_round": 0.05,
+    "contenders":      1,
+    "rnd_sd":          0.05,
+}
+
+# ------------------------
+# SIMULATION CACHE
+# ------------------------
+
+def _snap(value: float, step: float) -> float:
+    return round(round(value / step) * step, 10)
+
+
+class SimCache:
+    """
+    Size-bounded LRU memo of win probabilities keyed on quantized inputs.
+
+    Misses are priced at the snapped inputs, so every hit returns exactly
+    what a fresh call on that key would have estimated. Hit/miss counters
+    are exposed through `stats()`; `save()`/`load()` persist to disk.
+    A `parent` cache is read through on misses but never written to, so
+    `state()` holds only the entries priced here.
+    """
+
+    def __init__(self,
+                 maxsize: int = CACHE_MAXSIZE,
+                 resolution: dict = None,
+                 path: str = None,
+                 parent: "SimCache" = None):
+        self.maxsize    = maxsize
+        self.resolution = {**DEFAULT_RESOLUTION, **(resolution or {})}
+        self.path       = path
+        self.parent     = parent
+        self.hits       = 0
+        self.misses     = 0
+        self._data      = OrderedDict()
+        self._lock      = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def key(self, shots_behind, holes_left, sg_expect_round, contenders,
+            rnd_sd=DEFAULT_RND_SD, mode="mc", sims=DEFAULT_SIMS, method="plain"):
+        res = self.resolution
+        return (
+            _snap(shots_behind, res["shots_behind"]),
+            int(_snap(holes_left, res["holes_left"])),
+            _snap(sg_expect_round, res["sg_expect_round"]),
+            int(_snap(contenders, res["contenders"])),
+            _snap(rnd_sd, res["rnd_sd"]),
+            mode,
+            sims if mode in ("mc", "holes") else 0,
+            method if mode == "mc" else "",
+        )
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            if self.parent is not None:
+                value = self.parent.get(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def win_prob(self,
+                 shots_behind: float,
+                 holes_left: int,
+                 sg_expect_round: float,
+                 contenders: int = 20,
+                 sims: int = DEFAULT_SIMS,
+                 rnd_sd: float = DEFAULT_RND_SD,
+                 rng=None,
+                 mode: str = "mc",
+                 method: str = "plain") -> float:
+        """Cached drop-in for simulation.simulate_win_prob."""
+        key = self.key(shots_behind, holes_left, sg_expect_round, contenders,
+                       rnd_sd, mode, sims, method)
+        p = self.get(key)
+        if p is None:
+            sb, hl, sg, n, sd = key[:5]
+            p = simulate_win_prob(sb, hl, sg, contenders=n, sims=sims,
+                                  rnd_sd=sd, rng=rng, mode=mode, method=method)
+            self.put(key, p)
+        return p
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "size":     len(self._data),
+            "maxsize":  self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def state(self) -> dict:
+        """Picklable copy of the entries (oldest first)."""
+        with self._lock:
+            return {"resolution": self.resolution, "items": list(self._data.items())}
+
+    def restore(self, state: dict):
+        """Merge entries saved with the same resolution; others are ignored."""
+        if state.get("resolution") != self.resolution:
+            return
+        for key, value in state["items"]:
+            self.put(key, value)
+
+    def save(self, path: str = None):
+        """Write entries (oldest first) to `path` atomically."""
+        path = path or self.path
+        state = self.state()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(state, fh)
+        os.replace(tmp, path)
+
+    def load(self, path: str = None):
+        path = path or self.path
+        with open(path, "rb") as fh:
+            self.restore(pickle.load(fh))
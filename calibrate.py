@@ -0,0 +1,229 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+
+import scoring
+from scoring import (to_columns, read_players, score_features, quality_factor,
+                     _guess_format, NUMERIC_FIELDS, CALIBRATION_PATH)
+from simulation import simulate_win_probs, project_sg_remaining
+from store import SnapshotStore
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+OUTCOME_FIELD = "won"      # 1 if the snapshot's player went on to win
+PRIOR_WEIGHT  = 1.0        # ridge pull towards the current calibration
+NEWTON_TOL    = 1e-9
+NEWTON_MAX_IT = 50
+EPS           = 1e-12      # clip probabilities inside log-loss
+
+# ------------------------
+# DATA
+# ------------------------
+
+def load_dataset(path: str):
+    """
+    Player snapshots with outcomes: CSV/JSONL rows (INPUT_FIELDS + "won",
+    optional "p_sim"), a .npz of the same columns or the settled events of
+    a .snap snapshot store (stored p_sim reused). Returns (cols, won).
+    """
+    if path.endswith(".snap"):
+        store = SnapshotStore(path)
+        cols = store.columns(store.records)
+        settled = ~np.isnan(cols["won"])
+        cols = {k: (np.asarray(v)[settled] if k not in ("name", "quality") else
+                    [x for x, keep in zip(v, settled) if keep]) for k, v in cols.items()}
+        return cols, cols.pop("won")
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            cols = {f: data[f].astype(float) for f in NUMERIC_FIELDS}
+            cols["name"]    = list(data["name"]) if "name" in data else [""] * len(data["won"])
+            cols["quality"] = list(data["quality"]) if "quality" in data else ["average"] * len(cols["name"])
+            if "p_sim" in data:
+                cols["p_sim"] = data["p_sim"].astype(float)
+            return cols, data[OUTCOME_FIELD].astype(float)
+    with (sys.stdin if path == "-" else open(path, newline="")) as fh:
+        rows = read_players(fh, _guess_format(path, "csv"))
+    cols = to_columns(rows)
+    try:
+        won = np.array([float(r[OUTCOME_FIELD]) for r in rows])
+        if all("p_sim" in r for r in rows):
+            cols["p_sim"] = np.array([float(r["p_sim"]) for r in rows])
+    except (KeyError, ValueError) as exc:
+        raise ValueError(f"invalid outcome row: {exc}") from None
+    return cols, won
+
+
+def sim_probs(cols):
+    """
+    p_sim per row: the stored value if present, else the exact engine via
+    the precomputed lookup grid (O(rows); rows outside it fall back to
+    chunked quadrature).
+    """
+    if "p_sim" in cols:
+        return cols["p_sim"]
+    sg_remaining = project_sg_remaining(
+        cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"], cols["sg_putting"],
+        cols["holes_left"], total_holes=scoring.TOTAL_HOLES
+    )
+    return simulate_win_probs(cols["shots_behind"], cols["holes_left"].astype(int),
+                              sg_remaining, cols["n_contenders"].astype(int), mode="grid")
+
+# ------------------------
+# FITTING
+# ------------------------
+# logit p_model = a·(score − b) with score = (BASE + Σ c_k x_k)/q, so the
+# linear predictor is θ·[BASE/q, x_k/q…, 1] with θ = [a, a·c_k…, −a·b].
+# Clipping to 0–100 and P_FLOOR are left out of the fit.
+
+def design(cols):
+    """Design matrix and feature names for the logistic score fit."""
+    feats = score_features(cols)
+    names = list(scoring.SCORE_COEFS) + ["sb_pressure"]
+    q = quality_factor(cols)
+    X = np.empty((len(q), len(names) + 2))
+    X[:, 0] = scoring.SCORE_BASE / q
+    for j, f in enumerate(names, start=1):
+        X[:, j] = feats[f] / q
+    X[:, -1] = 1.0
+    return X, names
+
+
+def _theta_from_config(names):
+    coefs = {**scoring.SCORE_COEFS, "sb_pressure": -scoring.SB_SCALE}
+    a = scoring.a
+    return np.array([a] + [a * coefs[f] for f in names] + [-a * scoring.b])
+
+
+def log_loss(p, y):
+    p = np.clip(p, EPS, 1 - EPS)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log1p(-p)))
+
+
+def fit_logistic(X, y, theta0, prior_weight: float = PRIOR_WEIGHT):
+    """
+    Penalised maximum likelihood by Newton/IRLS, shrinking towards theta0
+    (which also pins the score scale when every row has the same quality).
+    """
+    def objective(theta):
+        z = X @ theta
+        nll = np.sum(np.logaddexp(0, z) - y * z)
+        return nll + 0.5 * prior_weight * np.sum((theta - theta0) ** 2)
+
+    theta = theta0.copy()
+    f = objective(theta)
+    ridge = prior_weight * np.eye(len(theta))
+    for _ in range(NEWTON_MAX_IT):
+        p = 0.5 * (1.0 + np.tanh(0.5 * (X @ theta)))    # overflow-free sigmoid
+        grad = X.T @ (p - y) + prior_weight * (theta - theta0)
+        hess = (X * (p * (1 - p))[:, None]).T @ X + ridge
+        step = np.linalg.solve(hess, grad)
+        t = 1.0
+        while t > 1e-8:
+            f_new = objective(theta - t * step)
+            if f_new <= f:
+                break
+            t *= 0.5
+        theta, f_old, f = theta - t * step, f, f_new
+        if f_old - f < NEWTON_TOL * max(1.0, abs(f)):
+            break
+    return theta
+
+
+def fit_blend(p_model, p_sim, y, tol: float = 1e-8):
+    """Blend weight w ∈ [0, 1] minimising log-loss of w·p_model + (1−w)·p_sim."""
+    d = p_model - p_sim
+
+    def slope(w):
+        p = np.clip(w * p_model + (1 - w) * p_sim, EPS, 1 - EPS)
+        return np.sum(d * ((1 - y) / (1 - p) - y / p))
+
+    # log-loss is convex in w, so bisect on the sign of its derivative
+    lo, hi = 0.0, 1.0
+    if slope(lo) >= 0:
+        return lo
+    if slope(hi) <= 0:
+        return hi
+    while hi - lo > tol:
+        mid = 0.5 * (lo + hi)
+        lo, hi = (mid, hi) if slope(mid) < 0 else (lo, mid)
+    return 0.5 * (lo + hi)
+
+
+def calibrate(cols, won, prior_weight: float = PRIOR_WEIGHT):
+    """
+    Fit a, b, SB_SCALE, SCORE_COEFS and BLEND_MODEL; returns the config dict.
+    Raises ValueError unless the data has both winners and non-winners.
+    """
+    won = np.asarray(won, dtype=float)
+    if not len(won):
+        raise ValueError("no settled rows to calibrate on (settle events in the store first)")
+    if not won.any():
+        raise ValueError(f"no winners among {len(won)} rows")
+    if won.all():
+        raise ValueError(f"no non-winners among {len(won)} rows")
+    p_sim = sim_probs(cols)
+    before = log_loss(scoring.BLEND_MODEL * scoring.logistic_p(scoring.heuristic_score(cols))
+                      + (1 - scoring.BLEND_MODEL) * p_sim, won)
+
+    X, names = design(cols)
+    theta = fit_logistic(X, won, _theta_from_config(names), prior_weight)
+    a = theta[0]
+    if a <= 0:
+        raise ValueError("fitted score slope is not positive; check the outcome column")
+    coefs = dict(zip(names, theta[1:-1] / a))
+    cfg = {
+        "a":           float(a),
+        "b":           float(-theta[-1] / a),
+        "sb_scale":    float(-coefs.pop("sb_pressure")),
+        "score_coefs": {k: float(v) for k, v in coefs.items()},
+    }
+
+    # Blend weight against the production p_model (clipped score, P_FLOOR)
+    saved = scoring.a, scoring.b, scoring.SB_SCALE, scoring.SCORE_COEFS
+    scoring.a, scoring.b, scoring.SB_SCALE, scoring.SCORE_COEFS = (
+        cfg["a"], cfg["b"], cfg["sb_scale"], cfg["score_coefs"])
+    try:
+        p_model = scoring.logistic_p(scoring.heuristic_score(cols))
+    finally:
+        scoring.a, scoring.b, scoring.SB_SCALE, scoring.SCORE_COEFS = saved
+    w = fit_blend(p_model, p_sim, won)
+    cfg["blend_model"] = float(w)
+    cfg["fit"] = {
+        "rows":            int(len(won)),
+        "winners":         int(won.sum()),
+        "log_loss_before": before,
+        "log_loss_after":  log_loss(w * p_model + (1 - w) * p_sim, won),
+    }
+    return cfg
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the scoring calibration to historical outcomes.")
+    parser.add_argument("input", help="player snapshots CSV/JSONL/NPZ with a 'won' column")
+    parser.add_argument("-o", "--output", default=CALIBRATION_PATH)
+    parser.add_argument("--prior-weight", type=float, default=PRIOR_WEIGHT,
+                        help="ridge pull towards the current calibration")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    cols, won = load_dataset(args.input)
+    t1 = time.perf_counter()
+    try:
+        cfg = calibrate(cols, won, args.prior_weight)
+    except ValueError as exc:
+        parser.error(f"{args.input}: {exc}")          # never overwrite the calibration
+    t2 = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(cfg, fh, indent=2)
+    fit = cfg["fit"]
+    print(f"{fit['rows']} rows ({fit['winners']} winners): log-loss "
+          f"{fit['log_loss_before']:.5f} → {fit['log_loss_after']:.5f}  "
+          f"[load {t1 - t0:.2f}s, fit {t2 - t1:.2f}s] → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+CHECKPOINT_PATH     = os.environ.get("ODDS_APEX_CHECKPOINT", "pricing.ckpt")
+CHECKPOINT_INTERVAL = 5.0     # seconds between checkpoints while prices are changing
+CHECKPOINT_VERSION  = 1
+COMPRESS_LEVEL      = 1       # zlib: cache keys are repetitive, fast level is enough
+
+# ------------------------
+# READ / WRITE
+# ------------------------
+
+def save_checkpoint(state: dict, path: str = CHECKPOINT_PATH):
+    """
+    Write `state` atomically (tmp file, fsync, rename): a crash mid-write
+    leaves the previous checkpoint in place.
+    """
+    body = zlib.compress(pickle.dumps({"version": CHECKPOINT_VERSION, "saved_at": time.time(),
+                                       **state}, protocol=pickle.HIGHEST_PROTOCOL), COMPRESS_LEVEL)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(body)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str = CHECKPOINT_PATH):
+    """The saved state dict, or None if there is no usable checkpoint."""
+    try:
+        with open(path, "rb") as fh:
+            state = pickle.loads(zlib.decompress(fh.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError) as exc:
+        print(f"Ignoring unreadable checkpoint {path}: {exc}", file=sys.stderr)
+        return None
+    if state.get("version") != CHECKPOINT_VERSION:
+        return None
+    return state
+
+# ------------------------
+# BACKGROUND CHECKPOINTER
+# ------------------------
+
+class Checkpointer:
+    """
+    Saves `collect()` to `path` every `interval` seconds, but only after
+    `touch()` reported a change since the last save. Runs on its own
+    thread; `close()` writes a final checkpoint.
+    """
+
+    def __init__(self, collect, path: str = CHECKPOINT_PATH, interval: float = CHECKPOINT_INTERVAL):
+        self.collect  = collect
+        self.path     = path
+        self.interval = interval
+        self.saves    = 0
+        self._changes = 0
+        self._saved   = 0
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+        self._thread.start()
+
+    def touch(self):
+        """Mark the pricing state as changed (cheap; call after every batch)."""
+        self._changes += 1
+
+    def flush(self):
+        """Save now if anything changed since the last checkpoint."""
+        with self._lock:
+            changes = self._changes
+            if changes == self._saved:
+                return
+            save_checkpoint(self.collect(), self.path)
+            self._saved = changes
+            self.saves += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except OSError as exc:
+                print(f"Checkpoint failed: {exc}", file=sys.stderr)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
@@ -0,0 +1,172 @@
+import csv
+import numpy as np
+
+from simulation import make_rng, field_winners, DEFAULT_SIMS
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+HOLE_CHUNK_CELLS = 4_000_000   # (sims × players × holes) uniforms per chunk
+TOTAL_HOLES      = 72
+OUTCOMES = np.array([-2, -1, 0, 1, 2])   # eagle, birdie, par, bogey, double+
+
+# Tour-average scoring distributions by par (eagle, birdie, par, bogey, double+)
+PAR_DISTRIBUTIONS = {
+    3: [0.000, 0.12, 0.68, 0.17, 0.030],
+    4: [0.002, 0.16, 0.64, 0.17, 0.028],
+    5: [0.030, 0.40, 0.47, 0.08, 0.020],
+}
+DEFAULT_PARS = [4, 5, 3, 4, 4, 4, 3, 4, 5, 4, 4, 3, 5, 4, 4, 3, 4, 5]
+
+# ------------------------
+# COURSE HOLE TABLE
+# ------------------------
+
+class Course:
+    """
+    Per-hole par and scoring distribution over OUTCOMES (relative to par)
+    for one 18-hole layout; rounds repeat the layout.
+    """
+
+    def __init__(self, par, probs):
+        self.par   = np.asarray(par, dtype=int)
+        probs      = np.asarray(probs, dtype=float)
+        self.probs = probs / probs.sum(axis=1, keepdims=True)
+        self.mean  = self.probs @ OUTCOMES
+        self.var   = self.probs @ OUTCOMES ** 2 - self.mean ** 2
+
+    @classmethod
+    def from_pars(cls, pars=DEFAULT_PARS):
+        return cls(pars, [PAR_DISTRIBUTIONS[p] for p in pars])
+
+    @classmethod
+    def from_csv(cls, path: str):
+        """
+        Columns: par, and optionally p_eagle, p_birdie, p_par, p_bogey,
+        p_double (tour defaults for that par are used when absent).
+        """
+        cols = ["p_eagle", "p_birdie", "p_par", "p_bogey", "p_double"]
+        par, probs = [], []
+        with open(path, newline="") as fh:
+            for row in csv.DictReader(fh):
+                p = int(row["par"])
+                par.append(p)
+                if all(row.get(c) not in (None, "") for c in cols):
+                    probs.append([float(row[c]) for c in cols])
+                else:
+                    probs.append(PAR_DISTRIBUTIONS[p])
+        return cls(par, probs)
+
+    def remaining(self, holes_left: int):
+        """Hole-table indices of the last `holes_left` holes of the event."""
+        start = TOTAL_HOLES - int(holes_left)
+        return np.arange(start, TOTAL_HOLES) % len(self.par)
+
+
+DEFAULT_COURSE = Course.from_pars()
+
+# ------------------------
+# HOLE-BY-HOLE ENGINE
+# ------------------------
+
+def _thresholds(course: Course, holes_left, sg_expect_round):
+    """
+    Cumulative outcome thresholds, shape (players, max_holes, 4).
+
+    Each player's skill tilts every hole's distribution exponentially,
+    p_k ∝ p_k·exp(−θ·k) with θ = (sg/18) / var(hole), which shifts the hole
+    mean by about −sg/18 strokes. Holes past a player's holes_left are
+    padded with a "par for certain" threshold row.
+    """
+    holes_left = np.asarray(holes_left, dtype=int)
+    sg         = np.asarray(sg_expect_round, dtype=float)
+    max_holes  = int(holes_left.max()) if holes_left.size else 0
+    players    = len(holes_left)
+
+    idx  = np.zeros((players, max_holes), dtype=int)
+    mask = np.zeros((players, max_holes), dtype=bool)
+    for i, h in enumerate(holes_left):
+        idx[i, :h]  = course.remaining(h)
+        mask[i, :h] = True
+
+    theta  = (sg[:, None] / 18.0) / course.var[idx]               # (players, holes)
+    logits = np.log(np.maximum(course.probs[idx], 1e-300)) - theta[..., None] * OUTCOMES
+    probs  = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probs *= course.probs[idx] > 0
+    probs /= probs.sum(axis=-1, keepdims=True)
+    cdf = np.cumsum(probs, axis=-1)[..., :-1]
+    cdf[~mask] = [0.0, 0.0, 1.0, 1.0]                              # always par
+    return cdf.astype(np.float32)
+
+
+def sample_hole_scores(cdf, n: int, rng: np.random.Generator):
+    """
+    Draw (n, players, holes) scores relative to par by inverse CDF:
+    outcome index = number of thresholds the uniform exceeds.
+    """
+    u = rng.random((n,) + cdf.shape[:2], dtype=np.float32)
+    idx = np.zeros(u.shape, dtype=np.int8)
+    for k in range(cdf.shape[-1]):
+        idx += u > cdf[..., k]
+    return idx - 2
+
+
+def count_hole_wins(shots_behind,
+                    sg_expect_round,
+                    holes_left,
+                    sims: int = DEFAULT_SIMS,
+                    rng=None,
+                    course: Course = DEFAULT_COURSE):
+    """Per-player win counts from discrete hole-by-hole simulation."""
+    shots_behind = np.asarray(shots_behind, dtype=float)
+    players      = len(shots_behind)
+    holes_left   = np.broadcast_to(np.asarray(holes_left, dtype=int), (players,))
+    sg           = np.broadcast_to(np.asarray(sg_expect_round, dtype=float), (players,))
+    rng  = make_rng(rng)
+    cdf  = _thresholds(course, holes_left, sg)
+    rows = max(1, HOLE_CHUNK_CELLS // max(1, players * cdf.shape[1]))
+    wins = np.zeros(players, dtype=np.int64)
+    done = 0
+    while done < sims:
+        n = min(rows, sims - done)
+        scores = sample_hole_scores(cdf, n, rng)
+        totals = shots_behind + scores.sum(axis=2, dtype=np.int16)
+        wins  += field_winners(totals, rng)
+        done  += n
+    return wins
+
+
+def simulate_field_holes(shots_behind,
+                         sg_expect_round,
+                         holes_left,
+                         sims: int = DEFAULT_SIMS,
+                         rng=None,
+                         course: Course = DEFAULT_COURSE):
+    """
+    Hole-by-hole joint field simulation; win probabilities sum to 1.
+    Whole-stroke scores make ties common, so playoffs are settled by
+    simulation.field_winners.
+    """
+    return count_hole_wins(shots_behind, sg_expect_round, holes_left,
+                           sims, rng, course) / sims
+
+
+def hole_win_prob(shots_behind: float,
+                  holes_left: int,
+                  sg_expect_round: float,
+                  contenders: int = 20,
+                  sims: int = DEFAULT_SIMS,
+                  rng=None,
+                  course: Course = DEFAULT_COURSE) -> float:
+    """
+    Hole-by-hole counterpart of simulate_win_prob: you against
+    `contenders-1` average (SG 0) rivals level with the leader.
+    """
+    if contenders <= 1:
+        return 1.0
+    sb = np.zeros(contenders)
+    sb[0] = shots_behind
+    sg = np.zeros(contenders)
+    sg[0] = sg_expect_round
+    return float(count_hole_wins(sb, sg, holes_left, sims, rng, course)[0] / sims)
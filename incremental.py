@@ -0,0 +1,153 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from holes import _thresholds, sample_hole_scores, Course, DEFAULT_COURSE, HOLE_CHUNK_CELLS
+from scoring import to_columns, read_players, _guess_format, TOTAL_HOLES
+from simulation import project_sg_remaining, make_rng
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+INCR_SIMS = 10_000      # kept paths per player: sims × holes_left bytes each
+
+# ------------------------
+# INCREMENTAL FIELD
+# ------------------------
+
+class IncrementalField:
+    """
+    Hole-by-hole field simulation that is kept between holes.
+
+    Every player's remaining holes are sampled once (int8, relative to
+    par) and stored. When a player completes a hole, the simulated score
+    for that hole is swapped for the observed one and the rest of the path
+    is reused. Holes are independent given skill, so the reused paths are
+    exact draws from the conditional distribution and need no reweighting.
+
+    Win probabilities are maintained incrementally: per sim we keep the
+    best total and how many players share it, and every player's running
+    sum of [leads]/[tied leaders] (ties as a fair playoff). An update only
+    touches the sims whose lead it can change, so a reprice costs about
+    sims + affected sims × players per changed player, not a full re-run.
+    """
+
+    def __init__(self, names, shots_behind, sg_expect_round, holes_left,
+                 sims: int = INCR_SIMS, rng=None, course: Course = DEFAULT_COURSE):
+        self.names  = list(names)
+        self.index  = {n: i for i, n in enumerate(self.names)}
+        self.sims   = sims
+        self.rng    = make_rng(rng)
+        self.course = course
+        players     = len(self.names)
+        holes_left  = np.broadcast_to(np.asarray(holes_left, dtype=int), (players,)).copy()
+        sg          = np.broadcast_to(np.asarray(sg_expect_round, dtype=float), (players,))
+
+        self.holes_left = holes_left
+        self.score = np.asarray(shots_behind, dtype=np.float32).copy()
+        self.paths = [self._sample(int(h), float(s)) for h, s in zip(holes_left, sg)]
+        self.pos   = np.zeros(players, dtype=int)              # consumed holes per path
+        rem = np.stack([p.sum(axis=0, dtype=np.int16) for p in self.paths], axis=1)
+        self.total = self.score + rem.astype(np.float32)       # (sims, players)
+        self.refresh()
+
+    def _sample(self, holes: int, sg: float):
+        """(holes, sims) int8 remaining-hole path for one player."""
+        if holes <= 0:
+            return np.zeros((0, self.sims), dtype=np.int8)
+        cdf = _thresholds(self.course, [holes], [sg])
+        out = np.empty((holes, self.sims), dtype=np.int8)
+        rows = max(1, HOLE_CHUNK_CELLS // holes)
+        for start in range(0, self.sims, rows):
+            n = min(rows, self.sims - start)
+            out[:, start:start + n] = sample_hole_scores(cdf, n, self.rng)[:, 0, :].T
+        return out
+
+    def refresh(self):
+        """Recompute the lead bookkeeping from scratch (also clears drift)."""
+        self.best  = self.total.min(axis=1)
+        leaders    = self.total == self.best[:, None]
+        self.count = leaders.sum(axis=1)
+        self.wins  = (leaders / self.count[:, None]).sum(axis=0)
+
+    def _set_column(self, j: int, new):
+        """Replace player j's totals, updating only sims whose lead can change."""
+        old  = self.total[:, j]
+        rows = np.flatnonzero((old == self.best) | (new <= self.best))
+        if rows.size:
+            sub = self.total[rows]
+            best, count = self.best[rows], self.count[rows]
+            self.wins -= ((sub == best[:, None]) / count[:, None]).sum(axis=0)
+            sub[:, j] = new[rows]
+            best = sub.min(axis=1)
+            leaders = sub == best[:, None]
+            count = leaders.sum(axis=1)
+            self.wins += (leaders / count[:, None]).sum(axis=0)
+            self.best[rows], self.count[rows] = best, count
+        self.total[:, j] = new
+
+    def complete_hole(self, name: str, score: int):
+        """Player `name` finished their next hole `score` strokes vs par."""
+        j = self.index[name]
+        if self.pos[j] >= len(self.paths[j]):
+            raise ValueError(f"{name} has no holes left")
+        simulated = self.paths[j][self.pos[j]]
+        self.pos[j] += 1
+        self.holes_left[j] -= 1
+        self.score[j] += score
+        self._set_column(j, self.total[:, j] - simulated + np.float32(score))
+
+    def adjust(self, name: str, strokes: float):
+        """Shift a player's position (penalty, scoring correction) on every path."""
+        j = self.index[name]
+        self.score[j] += strokes
+        self._set_column(j, self.total[:, j] + np.float32(strokes))
+
+    def resample(self, name: str, sg_expect_round: float):
+        """New skill estimate: redraw only this player's remaining holes."""
+        j = self.index[name]
+        self.paths[j] = self._sample(int(self.holes_left[j]), sg_expect_round)
+        self.pos[j] = 0
+        rem = self.paths[j].sum(axis=0, dtype=np.int16).astype(np.float32)
+        self._set_column(j, self.score[j] + rem)
+
+    def win_probs(self):
+        return self.wins / self.sims
+
+# ------------------------
+# CLI
+# ------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental hole-by-hole repricing.")
+    parser.add_argument("players", help="whole-field players CSV/JSONL")
+    parser.add_argument("holes", help="JSONL, one line per update: {name: score vs par, ...}")
+    parser.add_argument("--sims", type=int, default=INCR_SIMS)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    with open(args.players, newline="") as fh:
+        cols = to_columns(read_players(fh, _guess_format(args.players, "csv")))
+    sg = project_sg_remaining(cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"],
+                              cols["sg_putting"], cols["holes_left"], total_holes=TOTAL_HOLES)
+    field = IncrementalField(cols["name"], cols["shots_behind"], sg,
+                             cols["holes_left"].astype(int), args.sims, args.seed)
+    with open(args.holes, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            t0 = time.perf_counter()
+            for name, score in json.loads(line).items():
+                field.complete_hole(name, int(score))
+            p = field.win_probs()
+            out = {"reprice_ms": (time.perf_counter() - t0) * 1000.0,
+                   "p_sim": dict(zip(field.names, map(float, p)))}
+            sys.stdout.write(json.dumps(out) + "\n")
+
+
+if __name__ == "__main__":
+    main()
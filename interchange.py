@@ -0,0 +1,125 @@
+import json
+import re
+import numpy as np
+
+from scoring import OUTPUT_FIELDS, iter_rows
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+BOARD_PATH = "model_board.jsonl"   # rows appended by the model GUI (latest event, latest row per name)
+NUMERIC_BOARD_FIELDS = OUTPUT_FIELDS[1:]
+
+# Legacy text line (fallback only), compiled once
+RE_SCORE  = re.compile(r"Score[:%]?\s*([\d.]+)%")
+RE_MODEL  = re.compile(r"Model[:%]?\s*([\d.]+)%")
+RE_MARKET = re.compile(r"Market[:%]?\s*([\d.]+)%")
+RE_LIVE   = re.compile(r"LiveOdds[:]?\s*([\d.]+(?:\.[\d]+)?)")
+RE_EV     = re.compile(r"EV[:]?\s*([+-]?[0-9]+(?:\.[0-9]+)?)")
+
+# ------------------------
+# WRITERS
+# ------------------------
+
+def save_columns(results, path: str):
+    """Write a priced board (scoring column dict) as a compact .npz file."""
+    cols = {f: np.asarray(results[f], dtype=float) for f in NUMERIC_BOARD_FIELDS}
+    np.savez(path, name=np.asarray(results["name"], dtype=str), **cols)
+
+
+def append_rows(results, path: str = BOARD_PATH, event: str = None):
+    """Append priced rows to a JSONL board file, tagged with `event` if given."""
+    tag = {} if event is None else {"event": event}
+    with open(path, "a", encoding="utf-8") as fh:
+        for row in iter_rows(results):
+            fh.write(json.dumps({**row, **tag}) + "\n")
+
+# ------------------------
+# READERS
+# ------------------------
+
+def _from_rows(rows, event: str = None):
+    """
+    Column dict from JSON-style row dicts. The board file is shared across
+    sessions, so when rows carry an "event" only those of `event` (default:
+    the event of the last tagged row) are kept. A player priced more than
+    once keeps only its latest row (the board is append-only); rows missing
+    a field are skipped and counted in cols["skipped"].
+    """
+    rows = list(rows)
+    if event is None:
+        event = next((r["event"] for r in reversed(rows) if "event" in r), None)
+    if event is not None:
+        rows = [r for r in rows if r.get("event") == event]
+    latest, skipped = {}, 0
+    for r in rows:
+        if all(f in r for f in OUTPUT_FIELDS):
+            latest.pop(str(r["name"]), None)       # re-insert: order follows the latest price
+            latest[str(r["name"])] = r
+        else:
+            skipped += 1
+    keep = list(latest.values())
+    cols = {f: np.array([float(r[f]) for r in keep], dtype=float) for f in NUMERIC_BOARD_FIELDS}
+    cols["name"] = np.array(list(latest), dtype=str)
+    cols["skipped"] = skipped
+    return cols
+
+
+def load_columns(path: str, event: str = None):
+    """
+    Load a priced board as NumPy columns (OUTPUT_FIELDS, probabilities as
+    fractions) from a .npz written by save_columns or a JSONL board (one
+    event of it, see _from_rows).
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {**{f: data[f] for f in OUTPUT_FIELDS}, "skipped": 0}
+    with open(path, encoding="utf-8") as fh:
+        return parse_jsonl(fh, event)
+
+
+def parse_jsonl(lines, event: str = None):
+    return _from_rows((json.loads(line) for line in lines if line.strip()), event)
+
+
+def parse_text(lines):
+    """
+    Legacy fallback: scrape the human-readable model line. Only the fields
+    the line carries are recovered (p_model and p_sim are left as NaN).
+    """
+    rows = []
+    for line in lines:
+        if "|" not in line:
+            continue
+        name, stats = line.split("|", 1)
+        m_score  = RE_SCORE.search(stats)
+        m_model  = RE_MODEL.search(stats)
+        m_market = RE_MARKET.search(stats)
+        m_live   = RE_LIVE.search(stats)
+        m_ev     = RE_EV.search(stats)
+        if not (m_score and m_model and m_market and m_live and m_ev):
+            continue
+        p_final  = float(m_model.group(1)) / 100
+        p_market = float(m_market.group(1)) / 100
+        rows.append({
+            "name":      name.strip(),
+            "score":     float(m_score.group(1)),
+            "p_model":   float("nan"),
+            "p_sim":     float("nan"),
+            "p_final":   p_final,
+            "p_implied": p_market,
+            "edge":      p_final - p_market,
+            "fair_odds": float("nan"),
+            "live_odds": float(m_live.group(1)),
+            "ev":        float(m_ev.group(1)),
+        })
+    return _from_rows(rows)
+
+
+def parse_board_text(text: str):
+    """Columns from pasted text: JSONL when it looks like JSON, else legacy lines."""
+    lines = text.strip().splitlines()
+    if lines and lines[0].lstrip().startswith("{"):
+        return parse_jsonl(lines)
+    return parse_text(lines)
@@ -0,0 +1,116 @@
+import numpy as np
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+# Liability caps per signal (as fraction of bankroll)
+CAP_FACTORS = {
+    "Strong": 0.10,   # 10%
+    "Medium": 0.05,   #  5%
+    "Weak":   0.025   # 2.5%
+}
+
+# Delta→signal thresholds
+DELTA_THRESHOLDS = {
+    "Strong": 5,
+    "Medium": 3,
+    "Weak":   1
+}
+
+# Signal index 0 = none, then weakest → strongest
+SIGNALS = np.array(["", "Weak", "Medium", "Strong"], dtype=object)
+_EDGES  = np.array([DELTA_THRESHOLDS[s] for s in SIGNALS[1:]])
+
+# ------------------------
+# RANKING & SIGNALS
+# ------------------------
+
+def lay_board(cols):
+    """Lay-table view (percent units) of a priced board from interchange."""
+    return {
+        "name":     cols["name"],
+        "score":    cols["score"],
+        "model_p":  cols["p_final"] * 100,
+        "market_p": cols["p_implied"] * 100,
+        "odds":     cols["live_odds"],
+        "ev":       cols["ev"],
+        # edge in percentage points
+        "edge":     (cols["p_final"] - cols["p_implied"]) * 100,
+    }
+
+
+def ordinal_ranks(keys):
+    """
+    1-based ranks of `keys` ascending. Ties keep board order (stable sort),
+    so duplicate rows get distinct, deterministic ranks.
+    """
+    order = np.argsort(keys, kind="stable")
+    ranks = np.empty(len(keys), dtype=int)
+    ranks[order] = np.arange(1, len(keys) + 1)
+    return ranks
+
+
+def signal_index(delta):
+    """Signal strength per rank-delta: 0 (none) … 3 (Strong), see DELTA_THRESHOLDS."""
+    return np.searchsorted(_EDGES, np.asarray(delta), side="right")
+
+
+def rank_and_size(odds, model_p, bank: float):
+    """
+    Rank runners by market odds (low→fav) and model% (high→fav), assign
+    the rank-delta signal and size each signalled lay at its CAP_FACTORS
+    liability. Returns a column dict; unsignalled stake/liability are NaN.
+    """
+    odds    = np.asarray(odds, dtype=float)
+    model_p = np.asarray(model_p, dtype=float)
+    mkt_rank = ordinal_ranks(odds)
+    mod_rank = ordinal_ranks(-model_p)
+    delta    = mod_rank - mkt_rank
+    sig      = signal_index(delta)
+
+    caps = np.array([np.nan] + [CAP_FACTORS[s] for s in SIGNALS[1:]]) * bank
+    liability = caps[sig]
+    # Stake = liability / (odds - 1)
+    stake = liability / (odds - 1)
+    return {
+        "mkt_rank":  mkt_rank,
+        "mod_rank":  mod_rank,
+        "delta":     delta,
+        "signal":    SIGNALS[sig],
+        "liability": liability,
+        "stake":     stake,
+    }
+
+# ------------------------
+# TABLE
+# ------------------------
+
+def format_table(board, lays):
+    """
+    Text lines of the lay table, sorted by delta (largest first). `board`
+    holds name, score, model_p, market_p (percent), odds, edge and ev.
+    """
+    header = "{:<12}{:>5}{:>5}{:>5}{:>5}{:>5}{:>7}{:>7}{:>7}{:>7}{:>8}{:>8}\n".format(
+        "Player", "Sc", "Md%", "Mk%", "MPos", "MkPos", "Δ", "Signal", "Odds", "Edge", "AbsEV", "Stake", "Liab"
+    )
+    lines = [header, "-" * (len(header)-1) + "\n"]
+    for i in np.argsort(-lays["delta"], kind="stable"):
+        stk = f"{lays['stake'][i]:.2f}"     if lays["signal"][i] else ""
+        lia = f"{lays['liability'][i]:.2f}" if lays["signal"][i] else ""
+        lines.append("{:<12}{:>5.0f}{:>5.0f}{:>5.0f}{:>5d}{:>7d}{:>5d}{:>7}{:>7.2f}{:>7.2f}{:>8.2f}{:>8}{:>8}\n".format(
+            board["name"][i],
+            board["score"][i],
+            board["model_p"][i],
+            board["market_p"][i],
+            lays["mod_rank"][i],
+            lays["mkt_rank"][i],
+            lays["delta"][i],
+            lays["signal"][i],
+            board["odds"][i],
+            board["edge"][i],
+            abs(board["ev"][i]),       # display absolute EV
+            stk,
+            lia
+        ))
+    return lines
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import SimCache
+from scoring import (to_columns, validate_columns, score_players, iter_rows, read_players,
+                     load_calibration, SIM_MODES, DEFAULT_SIMS)
+from store import StoreWriter
+from stream import OddsBoard
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+PUBLISH_INTERVAL = 0.05   # seconds between board publishes (latency bound)
+
+# ------------------------
+# PER-PLAYER STATE
+# ------------------------
+
+class LiveBoard:
+    """
+    Per-player input table plus the priced board.
+
+    Leaderboard/SG updates that change a player's inputs mark them dirty;
+    only dirty players are re-scored. Updates that would leave a player
+    unpriceable (including odds ticks at or below 1) are rejected with
+    ValueError before they touch the table.
+    Updates may carry an absolute `to_par`, from which every player's
+    shots_behind and leaderboard_pos are re-derived, so a move by one
+    golfer also dirties each rival whose relative position shifts.
+    Odds ticks reprice market fields immediately without a re-score.
+    """
+
+    def __init__(self, players):
+        self.inputs   = {p["name"]: dict(p) for p in players}
+        self.board    = OddsBoard([])
+        self.dirty    = set(self.inputs)
+        self.received = {name: time.perf_counter() for name in self.inputs}
+        self.pending  = {}
+
+    def update_inputs(self, update: dict):
+        name = update["name"]
+        current = self.inputs.get(name, {"name": name})
+        if all(k in current and _same(current[k], v) for k, v in update.items()):
+            return
+        merged = {**current, **update}
+        validate_columns(to_columns([merged]))
+        self.inputs[name] = merged
+        self.dirty.add(name)
+        self.received.setdefault(name, time.perf_counter())
+
+    def update_odds(self, name: str, live_odds: float):
+        if name not in self.inputs:
+            return
+        if not live_odds > 1.0:
+            raise ValueError(f"{name}: live_odds must be > 1, got {live_odds}")
+        self.inputs[name]["live_odds"] = live_odds
+        row = self.board.apply(name, live_odds)
+        if row is not None:
+            self.pending[name] = row
+            self.received.setdefault(name, time.perf_counter())
+
+    def _rederive(self):
+        """Refresh shots_behind / leaderboard_pos from to_par; dirty the movers."""
+        placed = [p for p in self.inputs.values() if "to_par" in p]
+        if not placed:
+            return
+        scores = sorted(float(p["to_par"]) for p in placed)
+        leader = scores[0]
+        now    = time.perf_counter()
+        for p in placed:
+            to_par = float(p["to_par"])
+            derived = {
+                "shots_behind":    to_par - leader,
+                "leaderboard_pos": 1 + bisect_left(scores, to_par),
+            }
+            if any(p.get(k) is None or float(p[k]) != v for k, v in derived.items()):
+                p.update(derived)
+                self.dirty.add(p["name"])
+                self.received.setdefault(p["name"], now)
+
+    def take_dirty(self):
+        """Snapshot the inputs of every dirty player and clear the dirty set."""
+        self._rederive()
+        rows = [dict(self.inputs[name]) for name in self.dirty]
+        self.dirty = set()
+        return rows
+
+    def apply_priced(self, rows):
+        for row in rows:
+            name = row["name"]
+            self.board.rows[name] = row
+            odds = float(self.inputs[name].get("live_odds", row["live_odds"]))
+            self.board.apply(name, odds)       # ticks that landed mid-pricing
+            self.pending[name] = row
+
+    def take_pending(self):
+        now = time.perf_counter()
+        out = []
+        for name, row in self.pending.items():
+            t0 = self.received.pop(name, now)
+            out.append({**row, "latency_ms": (now - t0) * 1000.0})
+        self.pending = {}
+        return out
+
+
+def _same(a, b) -> bool:
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return a == b
+
+
+def price_rows(rows, mode, sims, cache, store=None, event=None):
+    """
+    Score a batch of player dicts (runs in the executor); optionally log
+    them to `store`. If the batch fails, players are priced one at a time
+    so a bad row only loses itself.
+    """
+    try:
+        cols = to_columns(rows)
+        results = score_players(cols, mode=mode, sims=sims, cache=cache)
+    except ValueError:
+        if len(rows) == 1:
+            raise
+        priced = []
+        for row in rows:
+            try:
+                priced.extend(price_rows([row], mode, sims, cache, store, event))
+            except ValueError as exc:
+                print(f"pricing error for {row.get('name')}: {exc}", file=sys.stderr)
+        return priced
+    if store is not None:
+        store.append(cols, results, event)
+    return list(iter_rows(results))
+
+# ------------------------
+# ASYNC FEEDS
+# ------------------------
+
+async def read_lines(spec: str):
+    """Yield lines from a JSONL file, unix:/path socket or tcp:host:port socket."""
+    if spec.startswith(("unix:", "tcp:")):
+        if spec.startswith("unix:"):
+            reader, writer = await asyncio.open_unix_connection(spec[5:])
+        else:
+            host, port = spec[4:].rsplit(":", 1)
+            reader, writer = await asyncio.open_connection(host, int(port))
+        try:
+            async for line in reader:
+                yield line.decode("utf-8")
+        finally:
+            writer.close()
+        return
+    with open(spec, encoding="utf-8") as fh:
+        for line in fh:
+            yield line
+            await asyncio.sleep(0)
+
+
+async def ingest(spec: str, handle, wake: asyncio.Event):
+    async for line in read_lines(spec):
+        if not line.strip():
+            continue
+        try:
+            handle(json.loads(line))
+        except (ValueError, KeyError, TypeError) as exc:
+            print(f"skipping feed line: {exc}", file=sys.stderr)
+            continue
+        wake.set()
+
+# ------------------------
+# SERVICE
+# ------------------------
+
+class LiveService:
+    def __init__(self, live: LiveBoard, out, mode="mc", sims=DEFAULT_SIMS,
+                 publish_interval=PUBLISH_INTERVAL, executor=None, store=None, event=None):
+        self.live     = live
+        self.out      = out
+        self.mode     = mode
+        self.sims     = sims
+        self.interval = publish_interval
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.cache    = SimCache()
+        self.store    = store        # store.StoreWriter for priced snapshots
+        self.event    = event
+        self.wake     = asyncio.Event()
+        self.done     = False        # feeds exhausted
+        self.finished = False        # final pricing pass complete
+
+    def on_leaderboard(self, update):
+        self.live.update_inputs(update)
+
+    def on_odds(self, tick):
+        self.live.update_odds(tick["name"], float(tick["live_odds"]))
+
+    async def pricing_loop(self):
+        """Re-score dirty players off the event loop; coalesces while busy."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            rows = self.live.take_dirty()
+            if rows:
+                try:
+                    priced = await loop.run_in_executor(
+                        self.executor, price_rows, rows, self.mode, self.sims, self.cache,
+                        self.store, self.event)
+                    self.live.apply_priced(priced)
+                except Exception as exc:          # keep pricing later updates
+                    print(f"pricing error: {exc}", file=sys.stderr)
+            if self.done and not self.live.dirty:
+                return
+
+    async def publish_loop(self):
+        while True:
+            rows = self.live.take_pending()
+            for row in rows:
+                self.out.write(json.dumps(row) + "\n")
+            if rows:
+                self.out.flush()
+            if self.finished and not self.live.pending:
+                return
+            await asyncio.sleep(self.interval)
+
+    async def run(self, leaderboard_spec: str = None, odds_spec: str = None):
+        self.wake.set()                    # initial full pricing
+        pricer    = asyncio.create_task(self.pricing_loop())
+        publisher = asyncio.create_task(self.publish_loop())
+        feeds = []
+        if leaderboard_spec:
+            feeds.append(ingest(leaderboard_spec, self.on_leaderboard, self.wake))
+        if odds_spec:
+            feeds.append(ingest(odds_spec, self.on_odds, self.wake))
+        await asyncio.gather(*feeds)
+        self.done = True
+        self.wake.set()
+        await pricer
+        self.finished = True
+        await publisher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live pricing pipeline.")
+    parser.add_argument("players", help="initial players CSV/JSONL (scoring.py input)")
+    parser.add_argument("--leaderboard", help="leaderboard/SG feed: file, unix:/path or tcp:host:port")
+    parser.add_argument("--odds", help="odds feed: file, unix:/path or tcp:host:port")
+    parser.add_argument("--mode", choices=SIM_MODES, default="mc")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--interval", type=float, default=PUBLISH_INTERVAL)
+    parser.add_argument("--store", help="append priced snapshots to this snapshot store")
+    parser.add_argument("--event", default=time.strftime("%Y-%m-%d"),
+                        help="event name recorded in the store")
+    args = parser.parse_args(argv)
+    load_calibration()
+
+    fmt = "csv" if args.players.endswith(".csv") else "jsonl"
+    with open(args.players, newline="") as fh:
+        live = LiveBoard(read_players(fh, fmt))
+    store = StoreWriter(args.store) if args.store else None
+    service = LiveService(live, sys.stdout, mode=args.mode, sims=args.sims,
+                          publish_interval=args.interval, store=store, event=args.event)
+    asyncio.run(service.run(args.leaderboard, args.odds))
+    if store is not None:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from scoring import to_columns, read_players, _guess_format, TOTAL_HOLES
+from simulation import (field_params, project_sg_remaining, make_rng,
+                        MAX_CHUNK_CELLS, DEFAULT_SIMS, DEFAULT_RND_SD)
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+MARKET_BUDGET = 50_000_000        # cached rank cells (sims × players) kept, ~100 MB of int16
+EVICTION_POLICIES = ("lru", "largest")
+PLACE_TERMS = (1, 5, 10, 20)      # finish positions priced by default
+
+# ------------------------
+# RANK TENSOR
+# ------------------------
+
+def finish_ranks(totals):
+    """
+    Standard competition ranks (1 = best; tied players share the best
+    rank) for each row of a (sims, players) score matrix, as int16.
+    """
+    sims, players = totals.shape
+    span = float(totals.max() - totals.min()) + 1.0
+    key = totals + np.arange(sims)[:, None] * span      # rows never interleave
+    flat = np.sort(key, axis=None)
+    below = np.searchsorted(flat, key, side="left") - np.arange(sims)[:, None] * players
+    return (below + 1).astype(np.int16)
+
+
+class RankTensor:
+    """
+    Finishing positions from one joint field simulation, kept as an int16
+    (sims, players) tensor so every place, top-N and head-to-head market is
+    answered from the same draws without re-simulating.
+    """
+
+    def __init__(self, names, ranks):
+        self.names = list(names)
+        self.ranks = ranks
+        self._pos  = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def simulate(cls, names, shots_behind, sg_expect_round, holes_left,
+                 sims: int = DEFAULT_SIMS, rnd_sd: float = DEFAULT_RND_SD,
+                 rng=None, round_scores: bool = True):
+        """Joint field draws (whole strokes by default, so ties happen)."""
+        rng = make_rng(rng)
+        offset, sd_scale = field_params(shots_behind, sg_expect_round, holes_left, rnd_sd)
+        players = len(offset)
+        ranks = np.empty((sims, players), dtype=np.int16)
+        rows = max(1, MAX_CHUNK_CELLS // players)
+        for start in range(0, sims, rows):
+            totals = offset + sd_scale * rng.standard_normal((min(rows, sims - start), players))
+            if round_scores:
+                totals = np.round(totals)
+            ranks[start:start + len(totals)] = finish_ranks(totals)
+        return cls(names, ranks)
+
+    @property
+    def sims(self):
+        return self.ranks.shape[0]
+
+    @property
+    def cells(self):
+        return self.ranks.size
+
+    def index(self, name: str) -> int:
+        return self._pos[name]
+
+    def _tie_counts(self, start, stop):
+        """Players sharing each entry's rank, for sims [start, stop)."""
+        r = self.ranks[start:stop].astype(np.int64) - 1
+        players = r.shape[1]
+        flat = r + np.arange(len(r))[:, None] * players
+        return np.bincount(flat.ravel(), minlength=flat.size)[flat]
+
+    def place_probs(self, n: int):
+        """
+        P(finish in the top n) per player, with ties across the cut-off
+        settled dead-heat style (a share of the places left). n=1 is the win
+        price, where the dead-heat share equals a fair playoff.
+        """
+        players = len(self.names)
+        total = np.zeros(players)
+        rows = max(1, MAX_CHUNK_CELLS // players)
+        for start in range(0, self.sims, rows):
+            r = self.ranks[start:start + rows].astype(np.int64)
+            if not (r <= n).any():
+                continue
+            ties = self._tie_counts(start, start + rows)
+            overlap = np.clip(n - r + 1, 0, ties)
+            total += (overlap / ties).sum(axis=0)
+        return total / self.sims
+
+    def position_probs(self, max_pos: int = None):
+        """(players, max_pos) matrix of P(rank == k), k = 1…max_pos (min ranks)."""
+        max_pos = max_pos or len(self.names)
+        out = np.zeros((len(self.names), max_pos))
+        rows = max(1, MAX_CHUNK_CELLS // len(self.names))
+        for start in range(0, self.sims, rows):
+            r = self.ranks[start:start + rows].astype(np.int64) - 1
+            keep = r < max_pos
+            cols = np.broadcast_to(np.arange(r.shape[1]), r.shape)
+            np.add.at(out, (cols[keep], r[keep]), 1)
+        return out / self.sims
+
+    def head_to_head(self, a: str, b: str):
+        """P(a beats b), P(tie) and P(b beats a) on final position."""
+        ra = self.ranks[:, self.index(a)]
+        rb = self.ranks[:, self.index(b)]
+        win, tie = int(np.count_nonzero(ra < rb)), int(np.count_nonzero(ra == rb))
+        return {"win": win / self.sims, "tie": tie / self.sims,
+                "lose": (self.sims - win - tie) / self.sims}
+
+# ------------------------
+# BOUNDED CACHE
+# ------------------------
+
+class MarketCache:
+    """
+    Rank tensors keyed on the field state, bounded to `budget` cached cells.
+    Eviction is least-recently-used ("lru") or biggest tensor first
+    ("largest"). A request larger than the whole budget is simulated with
+    sims cut to fit.
+    """
+
+    def __init__(self, budget: int = MARKET_BUDGET, policy: str = "lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"unknown eviction policy {policy!r}")
+        self.budget = budget
+        self.policy = policy
+        self.cells  = 0
+        self.hits   = 0
+        self.misses = 0
+        self._data  = OrderedDict()
+        self._lock  = threading.Lock()
+
+    @staticmethod
+    def key(names, shots_behind, sg_expect_round, holes_left, sims, rnd_sd, round_scores):
+        sg = np.broadcast_to(np.asarray(sg_expect_round, float), np.shape(shots_behind))
+        hl = np.broadcast_to(np.asarray(holes_left, float), np.shape(shots_behind))
+        return (tuple(names), tuple(np.round(shots_behind, 3)), tuple(np.round(sg, 3)),
+                tuple(np.round(hl)), sims, round(rnd_sd, 3), round_scores)
+
+    def tensor(self, names, shots_behind, sg_expect_round, holes_left,
+               sims: int = DEFAULT_SIMS, rnd_sd: float = DEFAULT_RND_SD,
+               rng=None, round_scores: bool = True) -> RankTensor:
+        sims = max(1, min(sims, self.budget // max(len(names), 1)))
+        k = self.key(names, shots_behind, sg_expect_round, holes_left, sims, rnd_sd, round_scores)
+        with self._lock:
+            t = self._data.get(k)
+            if t is not None:
+                self._data.move_to_end(k)
+                self.hits += 1
+                return t
+            self.misses += 1
+        t = RankTensor.simulate(names, shots_behind, sg_expect_round, holes_left,
+                                sims, rnd_sd, rng, round_scores)
+        with self._lock:
+            if k not in self._data:
+                self._data[k] = t
+                self.cells += t.cells
+                self._evict()
+        return t
+
+    def _evict(self):
+        while self.cells > self.budget and len(self._data) > 1:
+            if self.policy == "lru":
+                _, old = self._data.popitem(last=False)
+            else:
+                big = max(self._data, key=lambda k: self._data[k].cells)
+                old = self._data.pop(big)
+            self.cells -= old.cells
+
+    def stats(self) -> dict:
+        return {"tensors": len(self._data), "cells": self.cells, "budget": self.budget,
+                "hits": self.hits, "misses": self.misses}
+
+# ------------------------
+# CLI
+# ------------------------
+
+def field_tensor(cols, cache: MarketCache, sims: int, rng=None) -> RankTensor:
+    """Rank tensor for a to_columns field table (SG projected as in scoring)."""
+    sg = project_sg_remaining(cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"],
+                              cols["sg_putting"], cols["holes_left"], total_holes=TOTAL_HOLES)
+    return cache.tensor(cols["name"], cols["shots_behind"], sg, cols["holes_left"], sims, rng=rng)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Place, top-N and head-to-head prices for a field.")
+    parser.add_argument("input", help="whole-field players CSV/JSONL ('-' for stdin)")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"])
+    parser.add_argument("--places", default=",".join(map(str, PLACE_TERMS)),
+                        help="comma-separated top-N terms")
+    parser.add_argument("--h2h", action="append", default=[], help="match bet 'A,B' (repeatable)")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--budget", type=int, default=MARKET_BUDGET)
+    args = parser.parse_args(argv)
+
+    fmt = args.in_format or _guess_format(args.input, "csv")
+    fin = sys.stdin if args.input == "-" else open(args.input, newline="")
+    with fin:
+        cols = to_columns(read_players(fin, fmt))
+    tensor = field_tensor(cols, MarketCache(args.budget), args.sims, make_rng(args.seed))
+
+    places = [int(p) for p in args.places.split(",")]
+    probs = [tensor.place_probs(n) for n in places]
+    print(f"{'Player':<16}" + "".join(f"{'Top ' + str(n) if n > 1 else 'Win':>10}" for n in places))
+    for i in np.argsort(-probs[0], kind="stable"):
+        print(f"{tensor.names[i]:<16}" + "".join(f"{p[i] * 100:>9.2f}%" for p in probs))
+    for pair in args.h2h:
+        a, b = (s.strip() for s in pair.split(","))
+        h = tensor.head_to_head(a, b)
+        print(f"{a} v {b}: {h['win']:.3f} / tie {h['tie']:.3f} / {h['lose']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
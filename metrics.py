@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+ENABLED = os.environ.get("ODDS_APEX_METRICS", "") not in ("", "0")
+PREFIX  = "odds_apex"
+EXPORT_PATH     = os.environ.get("ODDS_APEX_METRICS_PATH", "metrics.prom")   # .json for JSON
+EXPORT_INTERVAL = 10.0    # seconds between snapshots written by the GUIs
+
+# Latency histogram bucket upper bounds (seconds); +Inf is implicit
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock       = threading.Lock()
+_histograms = {}    # stage → [bucket counts..., +Inf count], sum, count
+_counters   = {}    # name (optionally with {label="…"}) → value
+_gauges     = {}    # prefix → callable returning {name: value}
+_NULL       = nullcontext()
+
+# ------------------------
+# RECORDING
+# ------------------------
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+def observe(stage_name: str, seconds: float):
+    with _lock:
+        h = _histograms.get(stage_name)
+        if h is None:
+            h = _histograms[stage_name] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        h[0][bisect_left(BUCKETS, seconds)] += 1
+        h[1] += seconds
+        h[2] += 1
+
+
+def inc(name: str, value: float = 1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def register_gauges(prefix: str, fn):
+    """Sample `fn()` (a dict of numbers, e.g. SimCache.stats) at export time."""
+    _gauges[prefix] = fn
+
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def stage(name: str):
+    """
+    Time a block into the `name` latency histogram. When metrics are off
+    this returns a shared no-op context, so the only cost is one flag check.
+    """
+    return _Stage(name) if ENABLED else _NULL
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+# ------------------------
+# EXPORT
+# ------------------------
+
+def snapshot() -> dict:
+    with _lock:
+        hist = {k: {"buckets": list(zip([*BUCKETS, "+Inf"], v[0])), "sum": v[1], "count": v[2]}
+                for k, v in _histograms.items()}
+        counters = dict(_counters)
+    gauges = {}
+    for prefix, fn in _gauges.items():
+        for name, value in fn().items():
+            if isinstance(value, (int, float)):
+                gauges[f"{prefix}_{name}"] = value
+    return {"timestamp": time.time(), "stages": hist, "counters": counters, "gauges": gauges}
+
+
+def prometheus_text(snap: dict = None) -> str:
+    """Prometheus text exposition format of a snapshot."""
+    snap = snap or snapshot()
+    out = [f"# TYPE {PREFIX}_stage_seconds histogram"]
+    for stage_name, h in sorted(snap["stages"].items()):
+        cumulative = 0
+        for le, n in h["buckets"]:
+            cumulative += n
+            out.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage_name}",le="{le}"}} {cumulative}')
+        out.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage_name}"}} {h["sum"]:.9f}')
+        out.append(f'{PREFIX}_stage_seconds_count{{stage="{stage_name}"}} {h["count"]}')
+    for kind in ("counters", "gauges"):
+        typed = set()
+        for name, value in sorted(snap[kind].items()):
+            base = name.split("{", 1)[0]     # counters may carry labels: name{k="v"}
+            if base not in typed:
+                typed.add(base)
+                out.append(f"# TYPE {PREFIX}_{base} {kind[:-1]}")
+            out.append(f"{PREFIX}_{name} {value}")
+    return "\n".join(out) + "\n"
+
+
+def write(path: str):
+    """Write a snapshot atomically: JSON for *.json, Prometheus text otherwise."""
+    snap = snapshot()
+    body = json.dumps(snap, indent=2) if path.endswith(".json") else prometheus_text(snap)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        fh.write(body)
+    os.replace(tmp, path)
+
+
+def start_exporter(path: str = EXPORT_PATH, interval: float = EXPORT_INTERVAL) -> threading.Event:
+    """Write snapshots to `path` every `interval` seconds; set the returned event to stop."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            write(path)
+        write(path)
+
+    threading.Thread(target=loop, name="metrics-exporter", daemon=True).start()
+    return stop
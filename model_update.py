@@ -1,167 +1,235 @@
+import os
+import time
 import tkinter as tk
-from tkinter import messagebox
-import numpy as np
-import math
+from tkinter import messagebox, filedialog, simpledialog, ttk
+
+import metrics
+from cache import SimCache
+from interchange import append_rows, BOARD_PATH
+from simulation import load_grid
+from store import StoreWriter
+from pricer import BackgroundPricer
+from checkpoint import Checkpointer, load_checkpoint
+from scoring import (format_result_line, iter_rows, read_players, load_calibration,
+                     to_columns, validate_columns)
 
 # ------------------------
 # CONFIGURATION / GLOBALS
 # ------------------------
 
-# Logistic calibration anchors (re-anchored: Score=20→0.64%, Score=60→10%)
-p1, s1 = 0.0064, 20
-p2, s2 = 0.10,   60
-L1 = math.log(p1 / (1 - p1))
-L2 = math.log(p2 / (1 - p2))
-a  = (L2 - L1) / (s2 - s1)
-b  = s1 - L1 / a
+SIM_MODE    = "mc"   # win-prob engine: "mc", "exact" (quadrature) or "grid" (lookup)
 
-P_FLOOR    = 0.02    # never below 2%
-MAX_FAIR   = 50.0    # cap raw fair odds at 50×
-SB_SCALE   = 0.35    # shots-behind penalty scale
-BLEND_MODEL = 0.6    # weight on heuristic model when blending with sim
-TOTAL_HOLES = 72     # total holes in tournament
+if SIM_MODE == "grid":
+    load_grid()      # read the persisted grid once (built on first run)
 
-# ------------------------
-# SIMULATION FUNCTION
-# ------------------------
+load_calibration()       # fitted anchors/weights from calibrate.py, if present
+
+SIM_CACHE = SimCache()   # reprices that only move live_odds skip the simulation
+
+# Last checkpoint (see CHECKPOINT below); its event carries over a restart
+LAST_CHECKPOINT = load_checkpoint()
 
-def simulate_win_prob(shots_behind: float,
-                      holes_left: int,
-                      sg_expect_round: float,
-                      contenders: int = 20,
-                      sims: int = 5000,
-                      rnd_sd: float = 2.4):
-    """
-    Monte Carlo simulate your chance to win given:
-      - shots_behind: strokes you trail the leader
-      - holes_left: holes remaining in event
-      - sg_expect_round: your expected strokes-gained for remaining holes
-      - contenders: size of live contender set
-      - rnd_sd: round-to-round score stdev
-    """
-    mean_delta = -(sg_expect_round * holes_left / 18.0)
-    sd_scale   = rnd_sd * math.sqrt(holes_left / 18.0)
-    wins = 0
-    for _ in range(sims):
-        you    = shots_behind + np.random.normal(mean_delta, sd_scale)
-        others = np.random.normal(0, sd_scale, size=contenders-1)
-        if you <= others.min():
-            wins += 1
-    return wins / sims
+# Every priced snapshot is appended (off the GUI thread) to the snapshot store
+# (one writer per store: a second GUI on the same store prices without recording).
+# The event id is ODDS_APEX_EVENT, else the checkpointed event, else today's date,
+# so a restart after midnight stays on the same event.
+EVENT = (os.environ.get("ODDS_APEX_EVENT") or (LAST_CHECKPOINT or {}).get("event")
+         or time.strftime("%Y-%m-%d"))
+try:
+    STORE = StoreWriter()
+except RuntimeError as exc:
+    print(f"Snapshot store disabled: {exc}")
+    STORE = None
+
+# Stage timings: opt in with ODDS_APEX_METRICS=1 (written to metrics.EXPORT_PATH)
+if metrics.ENABLED:
+    metrics.register_gauges("sim_cache", SIM_CACHE.stats)
+    metrics.start_exporter()
 
 # ------------------------
 # CALCULATION LOGIC
 # ------------------------
 
+POLL_MS = 50             # board refresh interval while pricing runs in the background
+BOARD_COLUMNS = ("Player", "Score", "Final%", "Model%", "Sim%", "Mkt%", "Edge%", "Fair", "Odds", "EV")
+
+def on_priced(cols, results):
+    """Runs on the pricing thread after every batch."""
+    with metrics.stage("output"):
+        for row in iter_rows(results):
+            print(format_result_line(row))
+        append_rows(results, BOARD_PATH, EVENT)   # structured copy for output.py
+        if STORE is not None:
+            STORE.append(cols, results, EVENT)
+
+# Prices off the Tk thread; quick successive edits of a player coalesce
+PRICER = BackgroundPricer(mode=SIM_MODE, cache=SIM_CACHE, on_priced=on_priced)
+board_rows = {}          # name → latest priced row shown on the board
+
+# Inputs, priced rows, sim cache and RNG are checkpointed in the background
+# (checkpoint.CHECKPOINT_PATH) and restored on the next start
+CHECKPOINT = Checkpointer(lambda: {"event": EVENT, "cache": SIM_CACHE.state(), **PRICER.state()})
+
+def restore_checkpoint():
+    state = LAST_CHECKPOINT
+    if state is None:
+        return
+    saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state["saved_at"]))
+    if state.get("event") != EVENT:      # ODDS_APEX_EVENT names a different event
+        status_label.config(text=f"Checkpoint for {state.get('event')} ({saved}) not restored")
+        return
+    SIM_CACHE.restore(state["cache"])
+    PRICER.restore(state)
+    show_pending([p["name"] for p in state["inputs"]])
+    status_label.config(text=f"Restored {len(state['priced'])} priced players of {EVENT} "
+                             f"from {saved}")
+
+def on_close():
+    CHECKPOINT.close()
+    if STORE is not None:
+        STORE.close()
+    root.destroy()
+
+def settle_event():
+    """Record the event winner in the snapshot store (backtest/calibration outcomes)."""
+    if STORE is None:
+        messagebox.showerror("Settle Error", "The snapshot store is open in another process.")
+        return
+    sel = board.selection()
+    winner = simpledialog.askstring("Settle Event", f"Winner of {EVENT}:",
+                                    initialvalue=sel[0] if sel else "")
+    if not winner:
+        return
+    try:
+        STORE.settle(EVENT, winner.strip())
+    except ValueError as exc:
+        messagebox.showerror("Settle Error", str(exc))
+        return
+    status_label.config(text=f"{EVENT} settled: {winner.strip()}")
+
+def read_form():
+    with metrics.stage("parse"):
+        return {
+            # --- historic / pre-event metrics ---
+            "name":            name_entry.get().strip(),
+            "xwins":           float(xwins_entry.get()),
+            "total_shots":     float(total_shots_entry.get()),
+            "putt":            float(putt_entry.get()),
+            "t2g":             float(t2g_entry.get()),
+            "sg_true":         float(sg_true_entry.get()),
+            "sg_expected":     float(sg_expected_entry.get()),
+            "course_fit":      float(course_fit_entry.get()),
+            "ranking":         float(ranking_entry.get()),
+            "live_odds":       float(live_odds_entry.get()),
+            "leaderboard_pos": float(leaderboard_pos_entry.get()),
+            "finishes":        [float(e.get()) for e in finish_entries],
+            # --- in-play SG metrics ---
+            "sg_off_tee":      float(sg_off_tee_entry.get()),
+            "sg_approach":     float(sg_approach_entry.get()),
+            "sg_putting":      float(sg_putting_entry.get()),
+            "scrambling":      float(scrambling_entry.get()),
+            # --- new manual inputs ---
+            "holes_left":      int(holes_left_entry.get()),
+            "n_contenders":    int(n_contenders_entry.get()),
+            "quality":         quality_var.get(),
+            "shots_behind":    float(shots_behind_entry.get()),
+        }
+
 def calculate_score():
     try:
-        # --- historic / pre-event metrics ---
-        name            = name_entry.get().strip()
-        xwins           = float(xwins_entry.get())
-        total_shots     = float(total_shots_entry.get())
-        putt            = float(putt_entry.get())
-        T2G             = float(t2g_entry.get())
-        sg_true         = float(sg_true_entry.get())
-        sg_expected_pre = float(sg_expected_entry.get())
-        course_fit      = float(course_fit_entry.get())
-        ranking         = float(ranking_entry.get())
-        live_odds       = float(live_odds_entry.get())
-        leaderboard_pos = float(leaderboard_pos_entry.get())
-        finishes        = [float(e.get()) for e in finish_entries]
-        # --- in-play SG metrics ---
-        sg_off_tee      = float(sg_off_tee_entry.get())
-        sg_approach     = float(sg_approach_entry.get())
-        sg_putting      = float(sg_putting_entry.get())
-        scrambling      = float(scrambling_entry.get())
-        # --- new manual inputs ---
-        holes_left      = int(holes_left_entry.get())
-        n_contenders    = int(n_contenders_entry.get())
-        quality_key     = quality_var.get()
-        shots_behind    = float(shots_behind_entry.get())
+        player = read_form()
+        PRICER.submit(player)
     except ValueError:
         messagebox.showerror("Input Error", "Please enter valid numbers in every field.")
         return
+    show_pending([player["name"]])
 
-    # Derived pre-event
-    sg_diff   = sg_true - sg_expected_pre
-    avg_last5 = sum(finishes) / len(finishes)
-    pressure  = sg_diff * 15
-
-    # Build the heuristic score
-    score = (
-        50
-        + xwins
-        + total_shots * 0.5
-        + putt * 0.5
-        + T2G * 0.5
-        + pressure
-        + course_fit * 20
-        - ranking * 0.5
-        - leaderboard_pos * 0.3
-        - avg_last5 * 0.5
-        + sg_off_tee  * 0.5
-        + sg_approach * 0.5
-        + sg_putting  * 0.5
-        - (100 - scrambling) * 0.2
-    )
-
-    # Shots-Behind Penalty
-    sb_penalty = (shots_behind / math.sqrt(max(holes_left, 1))) * SB_SCALE
-    score -= sb_penalty
-
-    # Field quality factor
-    field_quality = {"weak": 0.9, "average": 1.0, "strong": 1.1}[quality_key]
-    score /= field_quality
-
-    # Clip and logistic mapping → p_model
-    score = float(np.clip(score, 0, 100))
-    p_model = 1.0 / (1.0 + math.exp(-a * (score - b)))
-    p_model = max(p_model, P_FLOOR)
-
-    # --- LIVE SG PROJECTION for remaining holes ---
-    holes_played = TOTAL_HOLES - holes_left
-    if holes_played > 0:
-        sg_so_far = sg_off_tee + sg_approach + sg_putting
-        sg_rate_per_hole = sg_so_far / holes_played
-        # blend with pre-event if desired
-        sg_remaining = 0.5 * sg_expected_pre + 0.5 * (sg_rate_per_hole * holes_left)
-    else:
-        sg_remaining = sg_expected_pre
-
-    # Monte Carlo simulation with live SG
-    p_sim = simulate_win_prob(
-        shots_behind=shots_behind,
-        holes_left=holes_left,
-        sg_expect_round=sg_remaining,
-        contenders=n_contenders
-    )
-
-    # Blend heuristic + simulation
-    p_final = BLEND_MODEL * p_model + (1 - BLEND_MODEL) * p_sim
-
-    # Market and EV
-    p_implied = 1.0 / live_odds
-    edge      = p_final - p_implied
-    fair_model = min(1.0 / p_final, MAX_FAIR)
-    fair_blend = 0.7 * fair_model + 0.3 * live_odds
-    ev_back = p_final * (live_odds - 1) - (1 - p_final)
-
-    # Output
-    out = (
-        f"{name}  |  Score: {score:6.2f}%  "
-        f"Model: {p_final*100:6.2f}%  Market: {p_implied*100:6.2f}%  "
-        f"Edge: {edge*100:+5.2f}%  FairOdds: {fair_blend:5.2f}  "
-        f"LiveOdds: {live_odds:4.2f}  EV: {ev_back:+.3f}"
-    )
-    print(out)
-    # (GUI label update removed — output now only appears in the terminal)
+def load_field():
+    path = filedialog.askopenfilename(
+        filetypes=[("Players", "*.csv *.jsonl"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        with open(path, newline="") as fh:
+            players = read_players(fh, "csv" if path.endswith(".csv") else "jsonl")
+        validate_columns(to_columns(players))   # all or nothing: a bad row submits none
+        for player in players:
+            PRICER.submit(player)
+    except (OSError, ValueError, KeyError) as exc:
+        messagebox.showerror("Load Error", str(exc))
+        return
+    show_pending([p["name"] for p in players])
+
+def reprice_all():
+    players = list(PRICER.inputs.values())
+    for player in players:
+        PRICER.submit(player)
+    show_pending([p["name"] for p in players])
+
+# ------------------------
+# BOARD
+# ------------------------
+
+def show_pending(names):
+    for name in names:
+        values = board_values(board_rows[name]) if name in board_rows else (name,) + ("",) * 9
+        values = values[:2] + ("…",) + values[3:]
+        if board.exists(name):
+            board.item(name, values=values)
+        else:
+            board.insert("", tk.END, iid=name, values=values)
+
+def board_values(r):
+    return (r["name"], f"{r['score']:.1f}", f"{r['p_final']*100:.2f}", f"{r['p_model']*100:.2f}",
+            f"{r['p_sim']*100:.2f}", f"{r['p_implied']*100:.2f}", f"{r['edge']*100:+.2f}",
+            f"{r['fair_odds']:.2f}", f"{r['live_odds']:.2f}", f"{r['ev']:+.3f}")
+
+def poll_pricer():
+    """Move finished rows onto the board, best price first."""
+    rows = PRICER.poll()
+    for row in rows:
+        if row["name"] is None:
+            status_label.config(text=f"Pricing error: {row['error']}")
+            name = row.get("player")
+            if name and board.exists(name):      # drop the "…" for the failed player
+                values = board_values(board_rows[name]) if name in board_rows else \
+                    (name, "error") + ("",) * 8
+                board.item(name, values=values)
+            continue
+        board_rows[row["name"]] = row
+        if board.exists(row["name"]):
+            board.item(row["name"], values=board_values(row))
+    if rows:
+        CHECKPOINT.touch()
+        order = sorted(board.get_children(), key=lambda n: -board_rows.get(n, {"p_final": -1})["p_final"])
+        for i, name in enumerate(order):
+            board.move(name, "", i)
+    waiting = PRICER.pending()
+    if waiting or rows:
+        status_label.config(text=f"{len(board_rows)} priced, {waiting} pricing")
+    root.after(POLL_MS, poll_pricer)
+
+def edit_selected(_event=None):
+    """Load the selected board row's inputs back into the form."""
+    sel = board.selection()
+    if not sel:
+        return
+    player = PRICER.inputs[sel[0]]
+    finishes = player.get("finishes") or [player.get(f"finish{i}", "") for i in range(1, 6)]
+    for key, entry in form_entries.items():
+        entry.delete(0, tk.END)
+        entry.insert(0, str(player.get(key, "")))
+    for entry, value in zip(finish_entries, finishes):
+        entry.delete(0, tk.END)
+        entry.insert(0, str(value))
+    quality_var.set(player.get("quality") or "average")
 
 # ------------------------
 # BUILD THE GUI
 # ------------------------
 
 root = tk.Tk()
-root.title("Odds Apex - Golf Model")
+root.title("Odds Apex - Golf Model - " + EVENT)
 
 # Basic pre-event fields
 fields = [
@@ -222,9 +290,38 @@ quality_var.set("average")
 tk.OptionMenu(root, quality_var, "weak", "average", "strong")\
     .grid(row=new_row+2, column=1, padx=4, pady=2)
 
-# Calculate button (no result_label any more)
+# Calculate / field buttons
 bottom = new_row + 3
-tk.Button(root, text="Calculate Score & EV", command=calculate_score)\
-    .grid(row=bottom, column=0, columnspan=2, pady=10)
+buttons = tk.Frame(root)
+buttons.grid(row=bottom, column=0, columnspan=2, pady=10)
+tk.Button(buttons, text="Calculate Score & EV", command=calculate_score).pack(side="left", padx=2)
+tk.Button(buttons, text="Load Field…", command=load_field).pack(side="left", padx=2)
+tk.Button(buttons, text="Reprice All", command=reprice_all).pack(side="left", padx=2)
+tk.Button(buttons, text="Settle Event…", command=settle_event).pack(side="left", padx=2)
+
+# Full-field board (select a row to edit that player in the form)
+board = ttk.Treeview(root, columns=BOARD_COLUMNS, show="headings", height=24)
+for col in BOARD_COLUMNS:
+    board.heading(col, text=col)
+    board.column(col, width=110 if col == "Player" else 62, anchor="w" if col == "Player" else "e")
+board.grid(row=0, column=2, rowspan=bottom+1, sticky="nsew", padx=6, pady=4)
+board.bind("<<TreeviewSelect>>", edit_selected)
+status_label = tk.Label(root, text="", anchor="w")
+status_label.grid(row=bottom+1, column=2, sticky="we", padx=6)
+root.columnconfigure(2, weight=1)
+
+form_entries = {
+    "name": name_entry, "xwins": xwins_entry, "total_shots": total_shots_entry,
+    "putt": putt_entry, "t2g": t2g_entry, "sg_true": sg_true_entry,
+    "sg_expected": sg_expected_entry, "course_fit": course_fit_entry,
+    "ranking": ranking_entry, "live_odds": live_odds_entry,
+    "leaderboard_pos": leaderboard_pos_entry, "shots_behind": shots_behind_entry,
+    "sg_off_tee": sg_off_tee_entry, "sg_approach": sg_approach_entry,
+    "sg_putting": sg_putting_entry, "scrambling": scrambling_entry,
+    "holes_left": holes_left_entry, "n_contenders": n_contenders_entry,
+}
 
+restore_checkpoint()
+root.protocol("WM_DELETE_WINDOW", on_close)
+root.after(POLL_MS, poll_pricer)
 root.mainloop()
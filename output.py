@@ -1,35 +1,47 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
-import re
-
-# Liability caps per signal (as fraction of bankroll)
-CAP_FACTORS = {
-    "Strong": 0.10,   # 10%
-    "Medium": 0.05,   #  5%
-    "Weak":   0.025   # 2.5%
-}
-
-# Delta→signal thresholds
-DELTA_THRESHOLDS = {
-    "Strong": 5,
-    "Medium": 3,
-    "Weak":   1
-}
-
-def classify_delta(delta):
-    """Map rank‐delta to a signal strength."""
-    if delta >= DELTA_THRESHOLDS["Strong"]:
-        return "Strong"
-    if delta >= DELTA_THRESHOLDS["Medium"]:
-        return "Medium"
-    if delta >= DELTA_THRESHOLDS["Weak"]:
-        return "Weak"
-    return None
+
+import metrics
+from interchange import load_columns, parse_board_text, parse_jsonl
+from lays import lay_board, rank_and_size, format_table
+from portfolio import kelly_portfolio, format_portfolio
+from server import PricingClient, SERVICE_URL
+
+loaded_board = None   # columns from "Load Board…", used when the paste box is empty
+client = PricingClient(SERVICE_URL)   # warm pricing service (server.py), kept alive
+
+def load_board():
+    global loaded_board
+    path = filedialog.askopenfilename(
+        filetypes=[("Model board", "*.npz *.jsonl"), ("All files", "*.*")])
+    if not path:
+        return
+    try:
+        loaded_board = load_columns(path)
+    except (OSError, ValueError, KeyError) as exc:
+        messagebox.showerror("Load Error", str(exc))
+        return
+    board_label.config(text=f"{len(loaded_board['name'])} players from {path}"
+                            + _skipped_note(loaded_board))
+
+def fetch_board():
+    global loaded_board
+    try:
+        cols = parse_jsonl(client.board_lines())
+    except (OSError, RuntimeError, ValueError) as exc:
+        messagebox.showerror("Service Error", f"Could not fetch board from {SERVICE_URL}: {exc}")
+        return
+    loaded_board = cols
+    board_label.config(text=f"{len(cols['name'])} players from {SERVICE_URL}" + _skipped_note(cols))
+
+def _skipped_note(cols):
+    n = cols.get("skipped", 0)
+    return f" ({n} incomplete rows skipped)" if n else ""
 
 def calculate_lays():
     output_txt.delete("1.0", tk.END)
-    lines = input_txt.get("1.0", tk.END).strip().splitlines()
+    text = input_txt.get("1.0", tk.END).strip()
 
     # Read bankroll
     try:
@@ -40,86 +52,39 @@ def calculate_lays():
         messagebox.showerror("Input Error", "Enter a positive bankroll.")
         return
 
-    players = []
-    # Parse each line for the relevant stats
-    for line in lines:
-        if "|" not in line:
-            continue
-        name, stats = line.split("|", 1)
-        name = name.strip()
-
-        # Extract fields (allow space after colon)
-        m_score  = re.search(r"Score[:%]?\s*([\d.]+)%", stats)
-        m_model  = re.search(r"Model[:%]?\s*([\d.]+)%", stats)
-        m_market = re.search(r"Market[:%]?\s*([\d.]+)%", stats)
-        m_live   = re.search(r"LiveOdds[:]?\s*([\d.]+(?:\.[\d]+)?)", stats)
-        m_ev     = re.search(r"EV[:]?\s*([+-]?[0-9]+(?:\.[0-9]+)?)", stats)
-
-        if not (m_score and m_model and m_market and m_live and m_ev):
-            continue
-
-        players.append({
-            "name":      name,
-            "score":     float(m_score.group(1)),
-            "model_p":   float(m_model.group(1)),
-            "market_p":  float(m_market.group(1)),
-            "odds":      float(m_live.group(1)),
-            "ev":        float(m_ev.group(1)),
-            # edge in percentage points
-            "edge":      float(m_model.group(1)) - float(m_market.group(1))
-        })
-
-    if not players:
+    # Structured board (file or pasted JSONL); legacy text lines as fallback
+    try:
+        with metrics.stage("lays_parse"):
+            cols = parse_board_text(text) if text or loaded_board is None else loaded_board
+    except (ValueError, KeyError) as exc:
+        messagebox.showerror("Input Error", f"Could not read model output: {exc}")
+        return
+
+    if not len(cols["name"]):
         output_txt.insert(tk.END, "No valid player data.\n")
         return
+    if cols.get("skipped"):
+        output_txt.insert(tk.END, f"Skipped {cols['skipped']} incomplete rows.\n")
 
-    # Rank by market odds (low→fav) and by model% (high→fav)
-    by_mkt = sorted(players, key=lambda x: x["odds"])
-    by_mod = sorted(players, key=lambda x: x["model_p"], reverse=True)
-
-    # Assign ranks and signals
-    for p in players:
-        p["mkt_rank"] = by_mkt.index(p) + 1
-        p["mod_rank"] = by_mod.index(p) + 1
-        p["delta"]    = p["mod_rank"] - p["mkt_rank"]
-        p["signal"]   = classify_delta(p["delta"]) if p["delta"] > 0 else None
-
-        # For all signaled players, allocate stake/liability by cap
-        if p["signal"]:
-            cap_liab = CAP_FACTORS[p["signal"]] * bank
-            # Stake = liability / (odds - 1)
-            p["liability"] = cap_liab
-            p["stake"]     = cap_liab / (p["odds"] - 1)
-        else:
-            p["stake"]     = None
-            p["liability"] = None
+    # Ranks, signals and capped stakes for the whole board at once
+    with metrics.stage("lays_rank"):
+        board = lay_board(cols)
+        lays = rank_and_size(board["odds"], board["model_p"], bank)
 
     # Build and print the table
-    header = "{:<12}{:>5}{:>5}{:>5}{:>5}{:>5}{:>7}{:>7}{:>7}{:>7}{:>8}{:>8}\n".format(
-        "Player", "Sc", "Md%", "Mk%", "MPos", "MkPos", "Δ", "Signal", "Odds", "Edge", "AbsEV", "Stake", "Liab"
-    )
-    output_txt.insert(tk.END, header)
-    output_txt.insert(tk.END, "-" * (len(header)-1) + "\n")
-
-    for p in sorted(players, key=lambda x: x["delta"], reverse=True):
-        stk = f"{p['stake']:.2f}"     if p["stake"]     is not None else ""
-        lia = f"{p['liability']:.2f}" if p["liability"] is not None else ""
-        line = "{:<12}{:>5.0f}{:>5.0f}{:>5.0f}{:>5d}{:>7d}{:>5d}{:>7}{:>7.2f}{:>7.2f}{:>8.2f}{:>8}{:>8}\n".format(
-            p["name"],
-            p["score"],
-            p["model_p"],
-            p["market_p"],
-            p["mod_rank"],
-            p["mkt_rank"],
-            p["delta"],
-            p["signal"] or "",
-            p["odds"],
-            p["edge"],
-            abs(p["ev"]),       # display absolute EV
-            stk,
-            lia
-        )
-        output_txt.insert(tk.END, line)
+    with metrics.stage("lays_table"):
+        output_txt.insert(tk.END, "".join(format_table(board, lays)))
+
+    # Field-wide fractional-Kelly back/lay book
+    if portfolio_var.get():
+        with metrics.stage("lays_portfolio"):
+            port = kelly_portfolio(cols["p_final"], board["odds"], bank)
+            output_txt.insert(tk.END, "".join(format_portfolio(board, port)))
+    metrics.inc("lay_boards_total")
+
+# Stage timings: opt in with ODDS_APEX_METRICS=1 (written to metrics.EXPORT_PATH)
+if metrics.ENABLED:
+    metrics.start_exporter()
 
 # --- GUI Setup ---
 root = tk.Tk()
@@ -129,6 +94,10 @@ FONT = ("Courier New", 11)
 
 tk.Label(root, text="Paste model output below:", font=FONT)\
     .grid(row=0, column=0, padx=5, pady=5)
+tk.Button(root, text="Load Board…", command=load_board, font=FONT)\
+    .grid(row=0, column=1, sticky="w", padx=5)
+tk.Button(root, text="Fetch Board", command=fetch_board, font=FONT)\
+    .grid(row=0, column=1, sticky="e", padx=5)
 input_txt = ScrolledText(root, width=135, height=8, font=FONT)
 input_txt.grid(row=1, column=0, columnspan=2)
 
@@ -138,7 +107,12 @@ balance_entry = tk.Entry(root, width=10, font=FONT)
 balance_entry.grid(row=2, column=1, sticky="w")
 
 tk.Button(root, text="Calculate", command=calculate_lays, font=FONT)\
-    .grid(row=3, column=0, columnspan=2, pady=8)
+    .grid(row=3, column=0, pady=8)
+board_label = tk.Label(root, text="", font=FONT)
+board_label.grid(row=3, column=1, sticky="w")
+portfolio_var = tk.BooleanVar(root, value=False)
+tk.Checkbutton(root, text="Portfolio (Kelly)", variable=portfolio_var, font=FONT)\
+    .grid(row=2, column=1, sticky="e", padx=5)
 
 output_txt = ScrolledText(root, width=135, height=15, font=FONT)
 output_txt.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
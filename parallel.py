@@ -0,0 +1,114 @@
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation import (
+    count_wins, count_field_wins, field_params, _round_params,
+    DEFAULT_SIMS, DEFAULT_RND_SD,
+)
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+SHARD_SIMS = 250_000      # sims per shard; fixes the stream layout for a seed
+
+_POOL = None
+_POOL_WORKERS = 0
+
+# ------------------------
+# PROCESS POOL
+# ------------------------
+
+def get_pool(workers: int = None) -> ProcessPoolExecutor:
+    """Return the persistent pool, (re)creating it only if the size changes."""
+    global _POOL, _POOL_WORKERS
+    workers = workers or os.cpu_count() or 1
+    if _POOL is None or _POOL_WORKERS != workers:
+        shutdown_pool()
+        _POOL = ProcessPoolExecutor(max_workers=workers)
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def shutdown_pool():
+    global _POOL, _POOL_WORKERS
+    if _POOL is not None:
+        _POOL.shutdown(cancel_futures=True)
+    _POOL, _POOL_WORKERS = None, 0
+
+
+atexit.register(shutdown_pool)
+
+# ------------------------
+# SHARDING
+# ------------------------
+
+def seed_sequence(seed=None) -> np.random.SeedSequence:
+    """Root SeedSequence from None, an int, a SeedSequence or a Generator."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(int(seed.integers(2**63)))
+    return np.random.SeedSequence(seed)
+
+
+def shard_plan(sims: int, seed=None):
+    """
+    Split `sims` into SHARD_SIMS-sized shards, each with its own spawned
+    SeedSequence. The plan depends only on (sims, seed), never on the worker
+    count, so merged counts are reproducible however the shards are spread.
+    """
+    n_shards = max(1, -(-sims // SHARD_SIMS))
+    sizes = [SHARD_SIMS] * (n_shards - 1) + [sims - SHARD_SIMS * (n_shards - 1)]
+    return list(zip(sizes, seed_sequence(seed).spawn(n_shards)))
+
+
+def _win_shard(offset, sd_scale, contenders, sims, seed_seq):
+    return count_wins(offset, sd_scale, contenders, sims, np.random.default_rng(seed_seq))
+
+
+def _field_shard(offset, sd_scale, sims, seed_seq, round_scores):
+    return count_field_wins(offset, sd_scale, sims, np.random.default_rng(seed_seq), round_scores)
+
+
+def _map(fn, jobs, workers):
+    """Run jobs in-process for one worker, else over the persistent pool."""
+    if (workers is not None and workers <= 1) or len(jobs) == 1:
+        return [fn(*job) for job in jobs]
+    pool = get_pool(workers)
+    return [f.result() for f in [pool.submit(fn, *job) for job in jobs]]
+
+# ------------------------
+# PARALLEL ENGINES
+# ------------------------
+
+def parallel_win_prob(shots_behind: float,
+                      holes_left: int,
+                      sg_expect_round: float,
+                      contenders: int = 20,
+                      sims: int = DEFAULT_SIMS,
+                      rnd_sd: float = DEFAULT_RND_SD,
+                      seed=None,
+                      workers: int = None) -> float:
+    """simulate_win_prob sharded across processes; shards merged by counts."""
+    offset, sd_scale = _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd)
+    jobs = [(float(offset), float(sd_scale), contenders, n, ss)
+            for n, ss in shard_plan(sims, seed)]
+    return sum(_map(_win_shard, jobs, workers)) / sims
+
+
+def parallel_field(shots_behind,
+                   sg_expect_round,
+                   holes_left,
+                   sims: int = DEFAULT_SIMS,
+                   rnd_sd: float = DEFAULT_RND_SD,
+                   seed=None,
+                   round_scores: bool = False,
+                   workers: int = None):
+    """simulate_field sharded across processes; per-player counts are summed."""
+    offset, sd_scale = field_params(shots_behind, sg_expect_round, holes_left, rnd_sd)
+    jobs = [(offset, sd_scale, n, ss, round_scores) for n, ss in shard_plan(sims, seed)]
+    return np.sum(_map(_field_shard, jobs, workers), axis=0) / sims
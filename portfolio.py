@@ -0,0 +1,142 @@
+import numpy as np
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+KELLY_FRACTION = 0.25     # fraction of full Kelly actually staked
+MAX_LOSS_FRAC  = 0.10     # worst case over every possible winner, × bankroll
+MAX_RUNNER_FRAC = 0.10    # per-runner lay liability / back stake cap, × bankroll
+P_MIN          = 1e-6     # keeps log-wealth finite for near-zero model probs
+NEWTON_TOL     = 1e-10
+NEWTON_MAX_IT  = 100
+
+# ------------------------
+# KELLY PORTFOLIO
+# ------------------------
+# Net back stake x_i per runner (negative = lay). If runner j wins the book
+# pays W_j = x_j·o_j − Σx; if nobody on the board wins, W = −Σx.
+
+def outcome_pnl(x, odds):
+    """P&L for each runner winning, plus a final 'field' outcome."""
+    total = x.sum()
+    return np.append(x * odds - total, -total)
+
+
+def _growth(x, p, odds, bank):
+    w = bank + outcome_pnl(x, odds)
+    if np.any(w <= 0):
+        return -np.inf
+    return float(p @ np.log(w / bank))
+
+
+def _newton_step(x, p, odds, bank, free):
+    """
+    Newton direction for max Σ p_k log(B + W_k) over the `free` runners
+    (others held fixed). The Hessian is a diagonal plus a rank-2 term, so
+    it is inverted with Woodbury in O(n).
+    """
+    d  = 1.0 / (bank + outcome_pnl(x, odds))
+    pr, dr = p[:-1], d[:-1]
+    c  = p @ d
+    g  = pr * odds * dr - c
+    u  = (pr * odds ** 2 * dr ** 2)[free]
+    v  = (pr * odds * dr ** 2)[free]
+    w  = p @ d ** 2
+    # −H = diag(u) + U C Uᵀ with U = [1, v], C = [[w, −1], [−1, 0]]
+    ones   = np.ones_like(u)
+    Dinv_g = g[free] / u
+    Dinv_U = np.stack([ones / u, v / u], axis=1)
+    C_inv  = np.array([[0.0, -1.0], [-1.0, -w]])
+    small  = C_inv + np.stack([ones, v], axis=0) @ Dinv_U
+    step   = np.zeros_like(x)
+    step[free] = Dinv_g - Dinv_U @ np.linalg.solve(small, np.array([Dinv_g.sum(), v @ Dinv_g]))
+    return step, g
+
+
+def kelly_portfolio(model_p,
+                    odds,
+                    bank: float,
+                    kelly_fraction: float = KELLY_FRACTION,
+                    max_loss_frac: float = MAX_LOSS_FRAC,
+                    max_runner_frac: float = MAX_RUNNER_FRAC):
+    """
+    Joint fractional-Kelly back/lay stakes across every runner.
+
+    Outcomes are mutually exclusive: model probabilities are rescaled to
+    sum to 1 if they exceed it, and any shortfall is assigned to a 'field'
+    outcome. Each runner's lay liability and back stake are capped at
+    max_runner_frac × bank (this also keeps the problem bounded when the
+    board's book is not exactly 100%). Full-Kelly stakes (with the caps
+    widened by 1/kelly_fraction) are found by projected Newton ascent, then
+    scaled by `kelly_fraction`, and scaled again if needed so that the worst
+    P&L over all winners is no worse than −max_loss_frac × bank.
+    """
+    odds = np.asarray(odds, dtype=float)
+    p    = np.maximum(np.asarray(model_p, dtype=float), P_MIN)
+    if p.sum() > 1.0:
+        p = p / p.sum()
+    p = np.append(p, max(1.0 - p.sum(), P_MIN))
+
+    # Widen the caps for full Kelly, so scaling back honours them
+    kelly_bank = bank
+    cap = max_runner_frac * bank / kelly_fraction
+    lo, hi = -cap / np.maximum(odds - 1, 1e-9), np.full_like(odds, cap)
+
+    x = np.zeros_like(odds)
+    f = _growth(x, p, odds, kelly_bank)
+    it = 0
+    for it in range(1, NEWTON_MAX_IT + 1):
+        g = _newton_step(x, p, odds, kelly_bank, np.ones(len(x), bool))[1]
+        free = ~(((x <= lo) & (g < 0)) | ((x >= hi) & (g > 0)))
+        if not free.any() or np.max(np.abs(g[free])) * kelly_bank < NEWTON_TOL:
+            break
+        step = _newton_step(x, p, odds, kelly_bank, free)[0]
+        t = 1.0
+        x_new = np.clip(x + step, lo, hi)
+        f_new = _growth(x_new, p, odds, kelly_bank)
+        while f_new <= f and t > 1e-12:
+            t *= 0.5
+            x_new = np.clip(x + t * step, lo, hi)
+            f_new = _growth(x_new, p, odds, kelly_bank)
+        if f_new <= f:
+            break
+        x, f = x_new, f_new
+
+    x = x * kelly_fraction
+    worst = outcome_pnl(x, odds).min()
+    if worst < -max_loss_frac * bank:
+        x *= max_loss_frac * bank / -worst
+
+    pnl  = outcome_pnl(x, odds)
+    back = np.maximum(x, 0.0)
+    lay  = np.maximum(-x, 0.0)
+    return {
+        "net":        x,
+        "back_stake": back,
+        "lay_stake":  lay,
+        "liability":  lay * (odds - 1),
+        "pnl_if_win": pnl[:-1],
+        "pnl_field":  float(pnl[-1]),
+        "worst_case": float(pnl.min()),
+        "growth":     _growth(x, p, odds, bank),
+        "iterations": it,
+    }
+
+
+def format_portfolio(board, port):
+    """Text lines for the portfolio stakes (only runners with a position)."""
+    lines = ["\n{:<12}{:>7}{:>7}{:>6}{:>9}{:>9}{:>10}\n".format(
+        "Player", "Odds", "Md%", "Side", "Stake", "Liab", "P&L(win)")]
+    for i in np.argsort(-np.abs(port["net"]), kind="stable"):
+        if abs(port["net"][i]) < 0.005:
+            continue
+        side = "Back" if port["net"][i] > 0 else "Lay"
+        stake = port["back_stake"][i] or port["lay_stake"][i]
+        lines.append("{:<12}{:>7.2f}{:>7.2f}{:>6}{:>9.2f}{:>9.2f}{:>10.2f}\n".format(
+            board["name"][i], board["odds"][i], board["model_p"][i], side,
+            stake, port["liability"][i], port["pnl_if_win"][i]))
+    lines.append(f"Worst case: {port['worst_case']:.2f}   "
+                 f"Field wins: {port['pnl_field']:.2f}   "
+                 f"Log-growth: {port['growth']:.5f}\n")
+    return lines
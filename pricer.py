@@ -0,0 +1,127 @@
+import queue
+import threading
+
+from scoring import to_columns, validate_columns, score_players, iter_rows, DEFAULT_SIMS
+from simulation import make_rng
+
+# ------------------------
+# BACKGROUND PRICER
+# ------------------------
+
+class BackgroundPricer:
+    """
+    Prices player dicts on a worker thread so the GUI never blocks.
+
+    `submit` only records the player's latest inputs. The worker prices
+    everything pending in one batch; inputs submitted again while a batch is
+    running simply replace the queued copy (coalescing), and results that
+    were overtaken by newer inputs are dropped. The GUI collects finished
+    rows with `poll()` from a `root.after` loop. A batch that fails is
+    repriced one player at a time, so only the bad row comes back as an
+    error ({"name": None, "player": …, "error": …}).
+
+    `state()`/`restore()` carry the inputs, the last priced row per player
+    and the RNG across a restart (see checkpoint.py).
+    """
+
+    def __init__(self, mode: str = "mc", sims: int = DEFAULT_SIMS, cache=None, on_priced=None,
+                 rng=None):
+        self.mode      = mode
+        self.sims      = sims
+        self.cache     = cache
+        self.on_priced = on_priced     # called on the worker with (cols, results)
+        self.rng       = make_rng(rng)
+        self.inputs    = {}            # name → latest submitted player dict
+        self.priced    = {}            # name → latest fresh priced row
+        self._version  = {}
+        self._pending  = {}            # name → (version, player)
+        self._results  = queue.SimpleQueue()
+        self._cv       = threading.Condition()
+        self._busy     = False
+        threading.Thread(target=self._run, name="pricer", daemon=True).start()
+
+    def submit(self, player: dict):
+        """Queue a reprice (raises ValueError now if the inputs are invalid)."""
+        validate_columns(to_columns([player]))
+        name = player["name"]
+        with self._cv:
+            v = self._version.get(name, 0) + 1
+            self._version[name] = v
+            self.inputs[name]   = player
+            self._pending[name] = (v, player)
+            self._cv.notify()
+
+    def pending(self) -> int:
+        """Players waiting for (or in) a pricing pass."""
+        with self._cv:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def poll(self):
+        """Priced rows finished since the last poll (main thread)."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._results.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def state(self) -> dict:
+        """Picklable snapshot for checkpointing (safe from any thread)."""
+        with self._cv:
+            return {"inputs": list(self.inputs.values()), "priced": list(self.priced.values()),
+                    "rng": self.rng.bit_generator.state}
+
+    def restore(self, state: dict):
+        """
+        Reload a `state()` snapshot: priced rows come back through `poll()`
+        straight away; players whose last inputs were never priced are
+        resubmitted.
+        """
+        with self._cv:
+            self.rng.bit_generator.state = state["rng"]
+            for row in state["priced"]:
+                self.priced[row["name"]] = row
+                self._results.put(row)
+        for player in state["inputs"]:
+            if player["name"] in self.priced:
+                with self._cv:
+                    self.inputs[player["name"]] = player
+                    self._version.setdefault(player["name"], 0)
+            else:
+                self.submit(player)
+
+    def _price(self, players):
+        """Priced rows for `players`, in order (raises if any row is bad)."""
+        cols = to_columns(players)
+        results = score_players(cols, mode=self.mode, sims=self.sims, rng=self.rng,
+                                cache=self.cache)
+        if self.on_priced is not None:
+            try:
+                self.on_priced(cols, results)
+            except Exception as exc:      # output I/O must not stop the pricer
+                self._results.put({"name": None, "player": None, "error": f"output: {exc}"})
+        return list(iter_rows(results))
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._pending:
+                    self._busy = False
+                    self._cv.wait()
+                batch, self._pending = self._pending, {}
+                self._busy = True
+            names = list(batch)
+            try:
+                priced = list(zip(names, self._price([batch[n][1] for n in names])))
+            except Exception:
+                priced = []
+                for n in names:
+                    try:
+                        priced.append((n, self._price([batch[n][1]])[0]))
+                    except Exception as exc:
+                        self._results.put({"name": None, "player": n, "error": f"{n}: {exc}"})
+            with self._cv:
+                for n, row in priced:
+                    if self._version[n] == batch[n][0]:
+                        self.priced[row["name"]] = row
+                        self._results.put(row)
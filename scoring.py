@@ -0,0 +1,426 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import numpy as np
+
+import metrics
+from cache import SimCache
+from simulation import (simulate_win_probs, simulate_field, project_sg_remaining, make_rng,
+                        SIM_MODES, DEFAULT_SIMS)
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+# Logistic calibration anchors (re-anchored: Score=20→0.64%, Score=60→10%)
+p1, s1 = 0.0064, 20
+p2, s2 = 0.10,   60
+L1 = math.log(p1 / (1 - p1))
+L2 = math.log(p2 / (1 - p2))
+a  = (L2 - L1) / (s2 - s1)
+b  = s1 - L1 / a
+
+P_FLOOR    = 0.02    # never below 2%
+MAX_FAIR   = 50.0    # cap raw fair odds at 50×
+SB_SCALE   = 0.35    # shots-behind penalty scale
+BLEND_MODEL = 0.6    # weight on heuristic model when blending with sim
+TOTAL_HOLES = 72     # total holes in tournament
+
+# Heuristic score = (SCORE_BASE + Σ coef·feature − SB_SCALE·sb_pressure) / quality
+SCORE_BASE  = 50
+SCORE_COEFS = {
+    "xwins":           1.0,
+    "total_shots":     0.5,
+    "putt":            0.5,
+    "t2g":             0.5,
+    "sg_diff":         15,     # pressure: sg_true − sg_expected
+    "course_fit":      20,
+    "ranking":        -0.5,
+    "leaderboard_pos": -0.3,
+    "avg_last5":      -0.5,
+    "sg_off_tee":      0.5,
+    "sg_approach":     0.5,
+    "sg_putting":      0.5,
+    "scrambling_miss": -0.2,   # 100 − scrambling
+}
+
+# Fitted overrides for a, b, BLEND_MODEL, SB_SCALE and SCORE_COEFS (calibrate.py)
+CALIBRATION_PATH = os.environ.get("ODDS_APEX_CALIBRATION", "calibration.json")
+
+FIELD_QUALITY = {"weak": 0.9, "average": 1.0, "strong": 1.1}
+
+# Input columns, same fields as the GUI form
+NUMERIC_FIELDS = [
+    "xwins", "total_shots", "putt", "t2g", "sg_true", "sg_expected",
+    "course_fit", "ranking", "live_odds", "leaderboard_pos", "shots_behind",
+    "finish1", "finish2", "finish3", "finish4", "finish5",
+    "sg_off_tee", "sg_approach", "sg_putting", "scrambling",
+    "holes_left", "n_contenders",
+]
+INPUT_FIELDS  = ["name"] + NUMERIC_FIELDS + ["quality"]
+FINISH_FIELDS = [f"finish{i}" for i in range(1, 6)]
+
+OUTPUT_FIELDS = [
+    "name", "score", "p_model", "p_sim", "p_final",
+    "p_implied", "edge", "fair_odds", "live_odds", "ev",
+]
+# Added to the output when p_sim comes from the adaptive estimator (target_se)
+ESTIMATE_FIELDS = ["p_sim_se", "p_sim_ci_low", "p_sim_ci_high", "sims_used"]
+
+# ------------------------
+# CALCULATION LOGIC
+# ------------------------
+
+def to_columns(rows):
+    """
+    Turn a list of player dicts (strings or numbers) into column arrays.
+    A "finishes" list may stand in for finish1..finish5; "quality" defaults
+    to "average". Raises ValueError on missing or non-numeric fields.
+    """
+    rows = [dict(r) for r in rows]
+    for r in rows:
+        if "finishes" in r and "finish1" not in r:
+            finishes = r["finishes"]
+            if len(finishes) != len(FINISH_FIELDS):
+                raise ValueError(f"{r.get('name', '?')}: expected 5 finishes")
+            r.update(zip(FINISH_FIELDS, finishes))
+    try:
+        cols = {f: np.array([float(r[f]) for r in rows], dtype=float) for f in NUMERIC_FIELDS}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"invalid player row: {exc}") from None
+    cols["name"]    = [str(r.get("name", "")).strip() for r in rows]
+    cols["quality"] = [str(r.get("quality") or "average").strip().lower() for r in rows]
+    return cols
+
+
+def score_features(cols):
+    """Heuristic-score inputs per row: SCORE_COEFS features plus sb_pressure."""
+    feats = {f: cols[f] for f in SCORE_COEFS if f in cols}
+    feats["sg_diff"]         = cols["sg_true"] - cols["sg_expected"]
+    feats["avg_last5"]       = np.mean([cols[f] for f in FINISH_FIELDS], axis=0)
+    feats["scrambling_miss"] = 100 - cols["scrambling"]
+    # Shots-Behind Penalty
+    feats["sb_pressure"]     = cols["shots_behind"] / np.sqrt(np.maximum(cols["holes_left"], 1))
+    return feats
+
+
+def quality_factor(cols):
+    """Field quality divisor per row."""
+    try:
+        return np.array([FIELD_QUALITY[q] for q in cols["quality"]])
+    except KeyError as exc:
+        raise ValueError(f"unknown field quality {exc}") from None
+
+
+def validate_columns(cols):
+    """Raise ValueError for rows score_players would reject (odds, quality)."""
+    if np.any(cols["live_odds"] <= 0):
+        raise ValueError("live_odds must be positive")
+    quality_factor(cols)
+
+
+def heuristic_score(cols):
+    """Clipped heuristic score (0–100) for every row."""
+    feats = score_features(cols)
+    score = SCORE_BASE + sum(c * feats[f] for f, c in SCORE_COEFS.items())
+    score = score - feats["sb_pressure"] * SB_SCALE
+
+    # Field quality factor
+    return np.clip(score / quality_factor(cols), 0, 100)
+
+
+def logistic_p(score):
+    """Logistic mapping score → p_model, floored at P_FLOOR."""
+    return np.maximum(1.0 / (1.0 + np.exp(-a * (score - b))), P_FLOOR)
+
+
+def load_calibration(path: str = CALIBRATION_PATH) -> bool:
+    """
+    Replace a, b, BLEND_MODEL, SB_SCALE and SCORE_COEFS with the values in a
+    calibrate.py JSON config. Returns False (defaults kept) if there is none.
+    """
+    global a, b, BLEND_MODEL, SB_SCALE, SCORE_COEFS
+    try:
+        with open(path, encoding="utf-8") as fh:
+            cfg = json.load(fh)
+    except FileNotFoundError:
+        return False
+    unknown = set(cfg["score_coefs"]) - set(SCORE_COEFS)
+    if unknown:
+        raise ValueError(f"unknown score coefficients {sorted(unknown)}")
+    a, b        = float(cfg["a"]), float(cfg["b"])
+    BLEND_MODEL = float(cfg["blend_model"])
+    SB_SCALE    = float(cfg["sb_scale"])
+    SCORE_COEFS = {**SCORE_COEFS, **{k: float(v) for k, v in cfg["score_coefs"].items()}}
+    return True
+
+
+def market_outputs(p_final, live_odds):
+    """Market-dependent fields: implied prob, edge, blended fair odds, back EV."""
+    p_implied  = 1.0 / live_odds
+    edge       = p_final - p_implied
+    fair_model = np.minimum(1.0 / p_final, MAX_FAIR)
+    fair_blend = 0.7 * fair_model + 0.3 * live_odds
+    ev_back    = p_final * (live_odds - 1) - (1 - p_final)
+    return p_implied, edge, fair_blend, ev_back
+
+
+def score_players(cols,
+                  mode: str = "mc",
+                  sims: int = DEFAULT_SIMS,
+                  rng=None,
+                  cache=None,
+                  method: str = "plain",
+                  p_sim=None,
+                  target_se: float = None,
+                  field: bool = False):
+    """
+    Price a table of players (column dict from `to_columns`) and return a
+    column dict with OUTPUT_FIELDS. Every stage is vectorized over rows.
+    Pass a cache.SimCache to memoize p_sim across calls; `method` picks the
+    Monte Carlo variance-reduction estimator (variance.VR_METHODS). A
+    precomputed `p_sim` array skips the simulation stage entirely.
+    With `target_se` ("mc" only) each p_sim is simulated adaptively until
+    its standard error reaches the target (cache unused), and the result
+    also carries ESTIMATE_FIELDS. With `field=True` the rows are one whole
+    field simulated jointly ("mc" or "holes"), so p_sim sums to 1 and
+    n_contenders is ignored.
+    """
+    validate_columns(cols)
+    with metrics.stage("heuristic"):
+        score   = heuristic_score(cols)
+        p_model = logistic_p(score)
+
+    estimate = None
+    if p_sim is not None:
+        p_sim, priced = np.asarray(p_sim, dtype=float), 0
+    elif field:
+        p_sim, priced = _simulate_field(cols, mode, sims, rng), len(cols["name"])
+    elif target_se is not None:
+        estimate = _adaptive(cols, mode, target_se, rng, method)
+        p_sim, priced = estimate["p"], len(estimate["p"])
+    else:
+        p_sim, priced = _simulate(cols, mode, sims, rng, cache, method)
+    metrics.inc("players_priced_total", len(p_sim))
+    metrics.inc(f'sim_calls_total{{mode="{mode}"}}', priced)
+    if mode in ("mc", "holes"):
+        metrics.inc("sim_paths_total", priced * sims)
+
+    # Blend heuristic + simulation
+    with metrics.stage("market"):
+        p_final = BLEND_MODEL * p_model + (1 - BLEND_MODEL) * p_sim
+        p_implied, edge, fair_blend, ev_back = market_outputs(p_final, cols["live_odds"])
+
+    results = {
+        "name":      cols["name"],
+        "score":     score,
+        "p_model":   p_model,
+        "p_sim":     p_sim,
+        "p_final":   p_final,
+        "p_implied": p_implied,
+        "edge":      edge,
+        "fair_odds": fair_blend,
+        "live_odds": cols["live_odds"],
+        "ev":        ev_back,
+    }
+    if estimate is not None:
+        results.update(p_sim_se=estimate["stderr"], p_sim_ci_low=estimate["ci_low"],
+                       p_sim_ci_high=estimate["ci_high"], sims_used=estimate["sims"])
+    return results
+
+
+def _adaptive(cols, mode, target_se, rng, method):
+    if mode != "mc":
+        raise ValueError("target_se needs mode='mc'")
+    from variance import adaptive_win_probs
+    sg_remaining = project_sg_remaining(
+        cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"], cols["sg_putting"],
+        cols["holes_left"], total_holes=TOTAL_HOLES
+    )
+    with metrics.stage("simulation"):
+        return adaptive_win_probs(cols["shots_behind"], cols["holes_left"].astype(int),
+                                  sg_remaining, cols["n_contenders"].astype(int),
+                                  target_se=target_se, rng=rng,
+                                  method="conditional" if method == "plain" else method)
+
+
+def _simulate_field(cols, mode, sims, rng):
+    """Joint p_sim for a whole field in one pass (sums to 1)."""
+    sg_remaining = project_sg_remaining(
+        cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"], cols["sg_putting"],
+        cols["holes_left"], total_holes=TOTAL_HOLES
+    )
+    with metrics.stage("simulation"):
+        if mode == "mc":
+            return simulate_field(cols["shots_behind"], sg_remaining, cols["holes_left"],
+                                  sims=sims, rng=rng)
+        if mode == "holes":
+            from holes import simulate_field_holes
+            return simulate_field_holes(cols["shots_behind"], sg_remaining,
+                                        cols["holes_left"].astype(int), sims=sims, rng=rng)
+    raise ValueError(f"field pricing needs mode 'mc' or 'holes', not {mode!r}")
+
+
+def _simulate(cols, mode, sims, rng, cache, method):
+    """p_sim per row and the number of rows that were actually simulated."""
+    # --- LIVE SG PROJECTION for remaining holes ---
+    with metrics.stage("simulation"):
+        sg_remaining = project_sg_remaining(
+            cols["sg_expected"], cols["sg_off_tee"], cols["sg_approach"], cols["sg_putting"],
+            cols["holes_left"], total_holes=TOTAL_HOLES
+        )
+        if cache is not None:
+            misses = cache.misses
+            p_sim = np.array([
+                cache.win_prob(sb, hl, sg, contenders=n, sims=sims, rng=rng, mode=mode,
+                               method=method)
+                for sb, hl, sg, n in zip(cols["shots_behind"], cols["holes_left"].astype(int),
+                                         np.broadcast_to(sg_remaining, len(cols["name"])),
+                                         cols["n_contenders"].astype(int))
+            ])
+            priced = cache.misses - misses
+        else:
+            p_sim = simulate_win_probs(
+                shots_behind=cols["shots_behind"],
+                holes_left=cols["holes_left"].astype(int),
+                sg_expect_round=sg_remaining,
+                contenders=cols["n_contenders"].astype(int),
+                sims=sims,
+                rng=rng,
+                mode=mode,
+                method=method
+            )
+            priced = len(p_sim)
+    return p_sim, priced
+
+# ------------------------
+# INPUT / OUTPUT
+# ------------------------
+
+def format_result_line(r) -> str:
+    """The human-readable line the GUI prints (and output.py parses)."""
+    line = (
+        f"{r['name']}  |  Score: {r['score']:6.2f}%  "
+        f"Model: {r['p_final']*100:6.2f}%  Market: {r['p_implied']*100:6.2f}%  "
+        f"Edge: {r['edge']*100:+5.2f}%  FairOdds: {r['fair_odds']:5.2f}  "
+        f"LiveOdds: {r['live_odds']:4.2f}  EV: {r['ev']:+.3f}"
+    )
+    if "p_sim_se" in r:
+        line += (f"  SimCI: {r['p_sim_ci_low']*100:.2f}–{r['p_sim_ci_high']*100:.2f}% "
+                 f"({int(r['sims_used'])} sims)")
+    return line
+
+
+def iter_rows(results):
+    """Yield one plain dict per player from a result column dict."""
+    fields = result_fields(results)[1:]
+    for i, name in enumerate(results["name"]):
+        row = {"name": name}
+        for f in fields:
+            row[f] = float(results[f][i])
+        if "sims_used" in row:
+            row["sims_used"] = int(row["sims_used"])
+        yield row
+
+
+def result_fields(results):
+    """OUTPUT_FIELDS plus any ESTIMATE_FIELDS the results carry."""
+    return OUTPUT_FIELDS + [f for f in ESTIMATE_FIELDS if f in results]
+
+
+def read_players(fh, fmt: str):
+    """Read player dicts from a CSV or JSONL stream."""
+    if fmt == "csv":
+        return list(csv.DictReader(fh))
+    return [json.loads(line) for line in fh if line.strip()]
+
+
+def write_results(results, fh, fmt: str):
+    """Stream priced rows to `fh` as csv, jsonl or the legacy text line."""
+    if fmt == "csv":
+        writer = csv.DictWriter(fh, fieldnames=result_fields(results))
+        writer.writeheader()
+        writer.writerows(iter_rows(results))
+    elif fmt == "jsonl":
+        for row in iter_rows(results):
+            fh.write(json.dumps(row) + "\n")
+    else:
+        for row in iter_rows(results):
+            fh.write(format_result_line(row) + "\n")
+
+
+def _guess_format(path: str, default: str) -> str:
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".json")):
+        return "jsonl"
+    if path.endswith(".npz"):
+        return "npz"
+    return default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a field of golfers headlessly.")
+    parser.add_argument("input", help="players CSV/JSONL ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output path ('-' for stdout)")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"])
+    parser.add_argument("--format", choices=["csv", "jsonl", "text", "npz"])
+    parser.add_argument("--mode", choices=SIM_MODES, default="mc")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--cache", help="persistent simulation cache file")
+    parser.add_argument("--method", default="plain",
+                        choices=["plain", "antithetic", "sobol", "conditional"],
+                        help="Monte Carlo variance reduction")
+    parser.add_argument("--field", action="store_true",
+                        help="input is the whole field: simulate it jointly so p_sim sums to 1")
+    parser.add_argument("--target-se", type=float,
+                        help="mc: simulate each player until p_sim's standard error reaches "
+                             "this (adds p_sim_se/CI/sims_used columns)")
+    parser.add_argument("--metrics", help="write stage timings to this .prom/.json file")
+    parser.add_argument("--calibration", default=CALIBRATION_PATH,
+                        help="fitted calibration config (used if it exists)")
+    args = parser.parse_args(argv)
+    load_calibration(args.calibration)
+    if args.metrics:
+        metrics.enable()
+
+    in_fmt  = args.in_format or _guess_format(args.input, "csv")
+    out_fmt = args.format or _guess_format(args.output, "csv")
+
+    fin = sys.stdin if args.input == "-" else open(args.input, newline="")
+    with fin, metrics.stage("parse"):
+        cols = to_columns(read_players(fin, in_fmt))
+    cache = SimCache(path=args.cache) if args.cache else None
+    if cache is not None:
+        metrics.register_gauges("sim_cache", cache.stats)
+    if args.target_se is not None and args.mode != "mc":
+        parser.error("--target-se needs --mode mc")
+    if args.field and args.mode not in ("mc", "holes"):
+        parser.error("--field needs --mode mc or holes")
+    results = score_players(cols, mode=args.mode, sims=args.sims,
+                            rng=make_rng(args.seed), cache=cache, method=args.method,
+                            target_se=args.target_se, field=args.field)
+    if cache is not None:
+        cache.save()
+
+    with metrics.stage("output"):
+        if out_fmt == "npz":
+            from interchange import save_columns
+            save_columns(results, args.output)
+        else:
+            fout = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+            try:
+                write_results(results, fout, out_fmt)
+            finally:
+                if fout is not sys.stdout:
+                    fout.close()
+    if args.metrics:
+        metrics.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Only the standard library at import time: scoring/NumPy load in a
+# background warm-up once the socket is already accepting connections.
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("ODDS_APEX_PORT", "8765"))
+SERVICE_URL = f"http://{HOST}:{PORT}"
+MAX_BODY = 64 * 1024 * 1024      # bytes accepted per request
+TIMEOUT  = 30                    # seconds for client requests / idle keep-alive
+IDLE_REUSE = 10                  # client reconnects rather than reuse a longer-idle connection
+
+# ------------------------
+# PRICING ENGINE
+# ------------------------
+
+class Engine:
+    """
+    Warm pricing state shared by every request: the scoring module, one
+    SimCache and the latest priced row per player (the board). With a
+    checkpoint path the board, cache and RNG are restored at warm-up and
+    checkpointed in the background after that.
+    """
+
+    def __init__(self, mode="mc", sims=None, store=None, event=None, checkpoint=None):
+        self.mode  = mode
+        self.sims  = sims
+        self.store_path = store
+        self.event = event
+        self.checkpoint_path = checkpoint
+        self.checkpointer = None
+        self.board = {}
+        self.lock  = threading.Lock()
+        self.ready = threading.Event()
+        self._error = None
+
+    def warm(self):
+        """Import and prime everything once (called off the accept loop)."""
+        try:
+            import scoring
+            self.scoring = scoring
+            from cache import SimCache
+            scoring.load_calibration()
+            if self.mode == "grid":
+                from simulation import load_grid
+                load_grid()
+            self.sims  = self.sims or scoring.DEFAULT_SIMS
+            self.cache = SimCache()
+            self.rng   = scoring.make_rng()
+            if self.checkpoint_path:
+                self._restore()
+            self.store = None
+            if self.store_path:
+                from store import StoreWriter
+                self.store = StoreWriter(self.store_path)
+            scoring.simulate_win_probs([0.0], [18], 0.0, [20], sims=100, mode=self.mode)
+        except Exception as exc:          # reported on every request instead of dying silently
+            self._error = exc
+        self.ready.set()
+
+    def _restore(self):
+        from checkpoint import Checkpointer, load_checkpoint
+        state = load_checkpoint(self.checkpoint_path)
+        if state is not None and state.get("event") != self.event:
+            print(f"checkpoint for event {state.get('event')!r} not restored "
+                  f"(serving {self.event!r})", file=sys.stderr)
+        elif state is not None:
+            self.cache.restore(state["cache"])
+            self.rng.bit_generator.state = state["rng"]
+            self.board = {row["name"]: row for row in state["priced"]}
+            print(f"restored {len(self.board)} players of {self.event!r}", file=sys.stderr)
+        self.checkpointer = Checkpointer(self.checkpoint_state, self.checkpoint_path)
+
+    def checkpoint_state(self):
+        with self.lock:
+            priced = list(self.board.values())
+            rng = self.rng.bit_generator.state
+        return {"event": self.event, "cache": self.cache.state(), "priced": priced, "rng": rng}
+
+    def price(self, players, mode=None, sims=None, method="plain", field=False):
+        """Price a list of player dicts; returns OUTPUT_FIELDS rows."""
+        self.ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"engine failed to start: {self._error}")
+        scoring = self.scoring
+        cols = scoring.to_columns(players)
+        with self.lock:                  # one Generator shared by the handler threads
+            seed = int(self.rng.integers(2**63))
+        results = scoring.score_players(cols, mode=mode or self.mode, sims=sims or self.sims,
+                                        rng=scoring.make_rng(seed), cache=self.cache, method=method,
+                                        field=bool(field))
+        if self.store is not None:
+            self.store.append(cols, results, self.event)
+        rows = list(scoring.iter_rows(results))
+        with self.lock:
+            for row in rows:
+                self.board[row["name"]] = row
+        if self.checkpointer is not None:
+            self.checkpointer.touch()
+        return rows
+
+    def settle(self, event, winner):
+        self.ready.wait()
+        if getattr(self, "store", None) is None:
+            raise RuntimeError("no snapshot store (start with --store)")
+        self.store.settle(event, winner)
+
+    def board_rows(self):
+        with self.lock:
+            return list(self.board.values())
+
+    def health(self):
+        info = {"status": "ok" if self.ready.is_set() and self._error is None else
+                ("error" if self._error else "warming"),
+                "mode": self.mode, "players": len(self.board)}
+        if self.ready.is_set() and self._error is None:
+            info["cache"] = self.cache.stats()
+        return info
+
+# ------------------------
+# HTTP SERVER
+# ------------------------
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    GET  /health  → engine status and cache stats
+    GET  /board   → latest priced row per player, as JSONL
+    POST /price   → {"players": [...], "mode"?, "sims"?, "method"?, "field"?} (or a
+                    bare list of players) → {"results": [...]}; rows join the
+                    board. "field": true prices the players as one joint field
+    POST /settle  → {"event", "winner"}: record the winner in the --store
+    DELETE /board → clear the board
+    """
+    protocol_version = "HTTP/1.1"        # keep-alive
+    disable_nagle_algorithm = True       # headers and body go out as separate writes
+    timeout = TIMEOUT
+    engine: Engine = None
+
+    def _send(self, status, body: bytes, ctype="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status, obj):
+        self._send(status, json.dumps(obj).encode("utf-8"))
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._json(200, self.engine.health())
+        elif self.path == "/board":
+            body = "".join(json.dumps(r) + "\n" for r in self.engine.board_rows())
+            self._send(200, body.encode("utf-8"), "application/x-ndjson")
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        if self.path != "/board":
+            self._json(404, {"error": "not found"})
+            return
+        with self.engine.lock:
+            self.engine.board.clear()
+        self._json(200, {"status": "cleared"})
+
+    def do_POST(self):
+        if self.path not in ("/price", "/settle"):
+            self._json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.close_connection = True         # the body cannot be delimited
+            self._json(400, {"error": "invalid Content-Length"})
+            return
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._json(413, {"error": "request too large"})
+            return
+        try:
+            req = json.loads(self.rfile.read(length) or b"null")
+            if self.path == "/settle":
+                self.engine.settle(str(req["event"]), str(req["winner"]))
+                self._json(200, {"status": "settled"})
+                return
+            if isinstance(req, list):
+                req = {"players": req}
+            rows = self.engine.price(req["players"], req.get("mode"), req.get("sims"),
+                                     req.get("method", "plain"), req.get("field", False))
+        except (ValueError, KeyError, TypeError) as exc:
+            self._json(400, {"error": str(exc)})
+            return
+        except RuntimeError as exc:
+            self._json(503, {"error": str(exc)})
+            return
+        except Exception as exc:                 # always answer; never drop the connection
+            self._json(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._json(200, {"results": rows})
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(engine: Engine, host=HOST, port=PORT, unix=None, verbose=False):
+    handler = type("BoundHandler", (Handler,), {"engine": engine})
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        server = UnixHTTPServer(unix, handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+# ------------------------
+# CLIENT
+# ------------------------
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class PricingClient:
+    """
+    Keep-alive client for the service (stdlib only; safe to import from the
+    GUIs). Only idempotent requests are retried after a dropped connection:
+    a POST that reached the server may already have been applied.
+    """
+
+    def __init__(self, url: str = SERVICE_URL, timeout: float = TIMEOUT):
+        self.url, self.timeout = url, timeout
+        self._conn = None
+        self._used = 0.0
+
+    def _connect(self):
+        if self.url.startswith("unix:"):
+            return _UnixConnection(self.url[5:], self.timeout)
+        host = self.url.split("://", 1)[-1].rstrip("/")
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def _request(self, method, path, body=None):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        if self._conn is not None and time.monotonic() - self._used > IDLE_REUSE:
+            self.close()                       # the server may be about to drop it
+        retries = 1 if method in ("GET", "DELETE") else 0
+        for attempt in range(retries + 1):     # reconnect once if the server closed it
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                self._conn.request(method, path, data, headers)
+                resp = self._conn.getresponse()
+                payload = resp.read()
+                break
+            except (OSError, http.client.HTTPException):    # OSError covers timeouts
+                self.close()
+                if attempt == retries:
+                    raise
+        self._used = time.monotonic()
+        if resp.status != 200:
+            raise RuntimeError(f"{method} {path}: {resp.status} {payload.decode(errors='replace')}")
+        return payload
+
+    def price(self, players, **options):
+        return json.loads(self._request("POST", "/price", {"players": players, **options}))["results"]
+
+    def board_lines(self):
+        """The priced board as JSONL lines (interchange.parse_jsonl input)."""
+        return self._request("GET", "/board").decode("utf-8").splitlines()
+
+    def health(self):
+        return json.loads(self._request("GET", "/health"))
+
+    def settle(self, event: str, winner: str):
+        return json.loads(self._request("POST", "/settle", {"event": event, "winner": winner}))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm local pricing service.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--mode", default="mc", help="default win-prob engine")
+    parser.add_argument("--sims", type=int)
+    parser.add_argument("--store", help="append priced snapshots to this snapshot store")
+    parser.add_argument("--event", default=os.environ.get("ODDS_APEX_EVENT", "service"))
+    parser.add_argument("--checkpoint", help="checkpoint file to restore from and save to")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    engine = Engine(args.mode, args.sims, args.store, args.event, args.checkpoint)
+    server = make_server(engine, args.host, args.port, args.unix, args.verbose)
+    threading.Thread(target=engine.warm, name="warm-up", daemon=True).start()
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"pricing service on {where}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if engine.ready.is_set() and getattr(engine, "store", None) is not None:
+            engine.store.close()
+        if engine.checkpointer is not None:
+            engine.checkpointer.close()
+
+
+if __name__ == "__main__":
+    main()
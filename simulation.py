@@ -0,0 +1,413 @@
+import math
+import os
+import numpy as np
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+DEFAULT_SIMS   = 5000     # sims per call (matches the original GUI default)
+DEFAULT_RND_SD = 2.4      # round-to-round score stdev
+MAX_CHUNK_CELLS = 4_000_000  # normals drawn per chunk (~32 MB of float64)
+
+# Quadrature / lookup grid
+QUAD_Z_MAX      = 8.0     # integrate your standardized draw over ±8 sd
+QUAD_STEP       = 0.01    # trapezoid step on that range
+GRID_M_MAX      = 10.0    # grid covers standardized deficit in ±10
+GRID_M_STEP     = 0.01
+GRID_MAX_CONTENDERS = 200
+GRID_PATH       = os.environ.get("ODDS_APEX_GRID", "win_grid.npz")
+
+SIM_MODES = ("mc", "exact", "grid", "holes")
+
+# ------------------------
+# RANDOM STREAMS
+# ------------------------
+
+def make_rng(seed=None):
+    """
+    Return a numpy Generator. `seed` may be None (fresh entropy), an int,
+    a SeedSequence or an existing Generator (returned unchanged).
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+# ------------------------
+# MONTE CARLO ENGINE
+# ------------------------
+
+def _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd):
+    """Mean offset of your final score vs the field and per-player stdev."""
+    mean_delta = -(sg_expect_round * holes_left / 18.0)
+    sd_scale   = rnd_sd * np.sqrt(holes_left / 18.0)
+    return shots_behind + mean_delta, sd_scale
+
+
+def count_wins(offset: float,
+               sd_scale: float,
+               contenders: int,
+               sims: int,
+               rng: np.random.Generator) -> int:
+    """
+    Count sims in which you (offset + N(0, sd)) finish at or below the best
+    of `contenders-1` N(0, sd) rivals. Draws a (chunk, contenders) matrix
+    per call so memory stays bounded for very large `sims`.
+    """
+    if contenders <= 1:
+        return sims
+    rows = max(1, MAX_CHUNK_CELLS // contenders)
+    wins = 0
+    done = 0
+    while done < sims:
+        n = min(rows, sims - done)
+        z = rng.standard_normal((n, contenders))
+        you    = offset + sd_scale * z[:, 0]
+        others = sd_scale * z[:, 1:].min(axis=1)
+        wins  += int(np.count_nonzero(you <= others))
+        done  += n
+    return wins
+
+
+def simulate_win_prob(shots_behind: float,
+                      holes_left: int,
+                      sg_expect_round: float,
+                      contenders: int = 20,
+                      sims: int = DEFAULT_SIMS,
+                      rnd_sd: float = DEFAULT_RND_SD,
+                      rng=None,
+                      mode: str = "mc",
+                      workers: int = None,
+                      method: str = "plain"):
+    """
+    Monte Carlo simulate your chance to win given:
+      - shots_behind: strokes you trail the leader
+      - holes_left: holes remaining in event
+      - sg_expect_round: your expected strokes-gained for remaining holes
+      - contenders: size of live contender set
+      - rnd_sd: round-to-round score stdev
+      - rng: seed or numpy Generator (None → fresh entropy)
+      - mode: "mc" (Monte Carlo), "exact" (quadrature), "grid" (lookup)
+        or "holes" (hole-by-hole, see holes.py)
+      - workers: shard "mc" sims over the process pool (see parallel.py)
+      - method: "mc" variance reduction (see variance.py), default "plain"
+    """
+    offset, sd_scale = _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd)
+    if mode == "mc" and method != "plain":
+        from variance import estimate_win_prob
+        return estimate_win_prob(shots_behind, holes_left, sg_expect_round, contenders,
+                                 sims=sims, rnd_sd=rnd_sd, rng=rng, method=method).p
+    if mode == "mc" and workers is not None:
+        from parallel import parallel_win_prob
+        return parallel_win_prob(shots_behind, holes_left, sg_expect_round, contenders,
+                                 sims=sims, rnd_sd=rnd_sd, seed=rng, workers=workers)
+    if mode == "holes":
+        from holes import hole_win_prob
+        return hole_win_prob(shots_behind, holes_left, sg_expect_round, contenders,
+                             sims=sims, rng=rng)
+    if mode == "exact":
+        return exact_win_prob(offset, sd_scale, contenders)
+    if mode == "grid":
+        grid = _GRID if _GRID is not None else load_grid()
+        return grid.lookup(offset, sd_scale, contenders)
+    if mode != "mc":
+        raise ValueError(f"unknown mode {mode!r}; expected one of {SIM_MODES}")
+    wins = count_wins(offset, sd_scale, contenders, sims, make_rng(rng))
+    return wins / sims
+
+
+def simulate_win_probs(shots_behind,
+                       holes_left,
+                       sg_expect_round,
+                       contenders,
+                       sims: int = DEFAULT_SIMS,
+                       rnd_sd: float = DEFAULT_RND_SD,
+                       rng=None,
+                       mode: str = "mc",
+                       method: str = "plain"):
+    """
+    Array version of simulate_win_prob: one independent win probability per
+    row of the (broadcast) inputs. "exact" and "grid" are fully vectorized;
+    "mc" runs count_wins (or the `method` estimator) once per row from a
+    single shared Generator.
+    """
+    shots_behind, holes_left, sg_expect_round, contenders = np.broadcast_arrays(
+        np.asarray(shots_behind, dtype=float), np.asarray(holes_left, dtype=float),
+        np.asarray(sg_expect_round, dtype=float), np.asarray(contenders, dtype=int))
+    offset, sd_scale = _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd)
+    out = np.where(offset <= 0, 1.0, 0.0)       # settled (sd = 0) rows
+    out[contenders <= 1] = 1.0
+    live = (sd_scale > 0) & (contenders > 1)
+    if mode == "holes" or (mode == "mc" and method != "plain"):
+        rng = make_rng(rng)
+        for i in np.flatnonzero(live):
+            out.flat[i] = simulate_win_prob(shots_behind.flat[i], holes_left.flat[i],
+                                            sg_expect_round.flat[i], int(contenders.flat[i]),
+                                            sims=sims, rnd_sd=rnd_sd, rng=rng,
+                                            mode=mode, method=method)
+        return out
+    if mode == "mc":
+        rng = make_rng(rng)
+        for i in np.flatnonzero(live):
+            out.flat[i] = count_wins(offset.flat[i], sd_scale.flat[i],
+                                     int(contenders.flat[i]), sims, rng) / sims
+        return out
+    if mode not in SIM_MODES:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {SIM_MODES}")
+    m = np.divide(offset, sd_scale, out=np.zeros_like(offset), where=live)
+    if mode == "grid":
+        grid = _GRID if _GRID is not None else load_grid()
+        in_grid = live & (contenders <= grid.max_contenders)
+        out[in_grid] = grid.lookup_std(m[in_grid], contenders[in_grid])
+        live &= ~in_grid
+    for n in np.unique(contenders[live]):
+        sel = live & (contenders == n)
+        out[sel] = exact_win_prob_std(m[sel], int(n))
+    return out
+
+# ------------------------
+# EXACT (QUADRATURE) ENGINE
+# ------------------------
+
+def norm_sf(x):
+    """
+    Vectorized standard normal survival function 1 - Φ(x).
+    Chebyshev erfc approximation (fractional error < 1.2e-7), numpy only.
+    """
+    x = np.asarray(x, dtype=float) / math.sqrt(2.0)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = (-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418
+            + t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587
+            + t * (-0.82215223 + t * 0.17087277)))))))))
+    erfc = t * np.exp(poly)
+    return 0.5 * np.where(x >= 0, erfc, 2.0 - erfc)
+
+
+def norm_ppf(u):
+    """
+    Vectorized standard normal quantile Φ⁻¹(u) for u in (0, 1).
+    Acklam's rational approximation (relative error < 1.2e-9), numpy only.
+    """
+    u = np.asarray(u, dtype=float)
+    a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+    b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+         6.680131188771972e+01, -1.328068155288572e+01)
+    c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+    d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+         3.754408661907416e+00)
+    tail = np.minimum(u, 1.0 - u)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.sqrt(-2.0 * np.log(tail))
+        t = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0)
+        r = (u - 0.5) ** 2
+        mid = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * (u - 0.5) / \
+              (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+    return np.where(tail < 0.02425, np.where(u < 0.5, t, -t), mid)[()]
+
+
+_QUAD_Z = np.arange(-QUAD_Z_MAX, QUAD_Z_MAX + QUAD_STEP / 2, QUAD_STEP)
+_QUAD_W = np.exp(-0.5 * _QUAD_Z ** 2) / math.sqrt(2 * math.pi) * QUAD_STEP
+_QUAD_W[[0, -1]] *= 0.5
+
+
+def exact_win_prob_std(m, contenders: int):
+    """
+    P(Z + m <= min of contenders-1 standard normals), i.e.
+    ∫ φ(z)·(1 − Φ(z + m))^(n−1) dz by trapezoid rule. `m` may be an array;
+    rows are integrated in chunks of at most MAX_CHUNK_CELLS quadrature cells.
+    """
+    m = np.asarray(m, dtype=float)
+    if contenders <= 1:
+        return np.ones_like(m)[()]
+    flat = m.ravel()
+    out = np.empty(flat.shape)
+    rows = max(1, MAX_CHUNK_CELLS // len(_QUAD_Z))
+    for start in range(0, len(flat), rows):
+        with np.errstate(divide="ignore"):
+            log_sf = np.log(norm_sf(flat[start:start + rows, None] + _QUAD_Z))
+        out[start:start + rows] = np.exp((contenders - 1) * log_sf) @ _QUAD_W
+    return out.reshape(m.shape)[()]
+
+
+def exact_win_prob(offset: float, sd_scale: float, contenders: int) -> float:
+    """Deterministic win probability for a final-score offset vs the field."""
+    if contenders <= 1:
+        return 1.0
+    if sd_scale <= 0:
+        return 1.0 if offset <= 0 else 0.0
+    return float(exact_win_prob_std(offset / sd_scale, contenders))
+
+# ------------------------
+# PRECOMPUTED LOOKUP GRID
+# ------------------------
+
+class WinProbGrid:
+    """
+    Exact win probabilities tabulated for interpolation.
+
+    The five pricing inputs (shots_behind, holes_left, sg_expect_round,
+    contenders, rnd_sd) only enter through the standardized deficit
+    m = offset / sd_scale and the contender count, so the grid is indexed
+    on (contenders, m) and linearly interpolated along m.
+    """
+
+    def __init__(self, m_values, table):
+        self.m_values = np.asarray(m_values, dtype=float)
+        self.table    = np.asarray(table, dtype=float)
+        self.m_lo     = float(self.m_values[0])
+        self.m_step   = float(self.m_values[1] - self.m_values[0])
+        self.max_contenders = self.table.shape[0] - 1
+
+    @classmethod
+    def build(cls,
+              m_max: float = GRID_M_MAX,
+              m_step: float = GRID_M_STEP,
+              max_contenders: int = GRID_MAX_CONTENDERS):
+        m_values = np.arange(-m_max, m_max + m_step / 2, m_step)
+        with np.errstate(divide="ignore"):
+            log_sf = np.log(norm_sf(m_values[:, None] + _QUAD_Z))
+        table = np.ones((max_contenders + 1, len(m_values)))
+        for n in range(2, max_contenders + 1):
+            table[n] = np.exp((n - 1) * log_sf) @ _QUAD_W
+        return cls(m_values, table)
+
+    def save(self, path: str = GRID_PATH):
+        np.savez_compressed(path, m_values=self.m_values, table=self.table)
+
+    @classmethod
+    def load(cls, path: str = GRID_PATH):
+        with np.load(path) as data:
+            return cls(data["m_values"], data["table"])
+
+    def lookup_std(self, m, contenders):
+        """Interpolated win probability for standardized deficit(s) `m`."""
+        pos  = np.clip((np.asarray(m, dtype=float) - self.m_lo) / self.m_step,
+                       0, len(self.m_values) - 1)
+        lo   = np.minimum(pos.astype(int), len(self.m_values) - 2)
+        frac = pos - lo
+        n    = np.clip(contenders, 0, self.max_contenders)
+        return (self.table[n, lo] * (1 - frac) + self.table[n, lo + 1] * frac)[()]
+
+    def lookup(self, offset: float, sd_scale: float, contenders: int) -> float:
+        if contenders <= 1:
+            return 1.0
+        if sd_scale <= 0:
+            return 1.0 if offset <= 0 else 0.0
+        if contenders > self.max_contenders:
+            return exact_win_prob(offset, sd_scale, contenders)
+        return float(self.lookup_std(offset / sd_scale, contenders))
+
+
+_GRID = None
+
+
+def load_grid(path: str = GRID_PATH, build_if_missing: bool = True) -> WinProbGrid:
+    """
+    Load the persisted grid into the module (call once at startup).
+    Builds and saves it when the file is missing.
+    """
+    global _GRID
+    if os.path.exists(path):
+        _GRID = WinProbGrid.load(path)
+    elif build_if_missing:
+        _GRID = WinProbGrid.build()
+        _GRID.save(path)
+    else:
+        raise FileNotFoundError(path)
+    return _GRID
+
+# ------------------------
+# WHOLE-FIELD SIMULATION
+# ------------------------
+
+def project_sg_remaining(sg_expected_pre,
+                         sg_off_tee,
+                         sg_approach,
+                         sg_putting,
+                         holes_left,
+                         total_holes: int = 72):
+    """
+    Live SG projection for the remaining holes (scalars or arrays):
+    half pre-event expectation, half in-play rate × holes left.
+    """
+    sg_expected_pre = np.asarray(sg_expected_pre, dtype=float)
+    holes_left      = np.asarray(holes_left, dtype=float)
+    holes_played    = total_holes - holes_left
+    sg_so_far       = np.asarray(sg_off_tee) + np.asarray(sg_approach) + np.asarray(sg_putting)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = sg_so_far / holes_played
+    live = 0.5 * sg_expected_pre + 0.5 * (rate * holes_left)
+    return np.where(holes_played > 0, live, sg_expected_pre)[()]
+
+
+def field_params(shots_behind, sg_expect_round, holes_left, rnd_sd: float = DEFAULT_RND_SD):
+    """Per-player final-score offsets and stdevs for the whole field."""
+    shots_behind = np.asarray(shots_behind, dtype=float)
+    holes_left   = np.broadcast_to(np.asarray(holes_left, dtype=float), shots_behind.shape)
+    return _round_params(shots_behind, holes_left,
+                         np.asarray(sg_expect_round, dtype=float), rnd_sd)
+
+
+def count_field_wins(offset,
+                     sd_scale,
+                     sims: int,
+                     rng: np.random.Generator,
+                     round_scores: bool = False):
+    """
+    Per-player win counts over `sims` joint draws of the field. Ties for
+    the lead are settled by a uniform random playoff among the tied players.
+    """
+    players = len(offset)
+    rows = max(1, MAX_CHUNK_CELLS // players)
+    wins = np.zeros(players, dtype=np.int64)
+    done = 0
+    while done < sims:
+        n = min(rows, sims - done)
+        totals = offset + sd_scale * rng.standard_normal((n, players))
+        if round_scores:
+            totals = np.round(totals)
+        wins  += field_winners(totals, rng)
+        done  += n
+    return wins
+
+
+def field_winners(totals, rng: np.random.Generator):
+    """
+    Win counts per player from a (sims, players) matrix of final scores.
+    Ties for the lead go to a uniform random playoff: every tied leader
+    draws a random key and the highest key wins.
+    """
+    best = totals.min(axis=1, keepdims=True)
+    keys = np.where(totals <= best, rng.random(totals.shape), -1.0)
+    return np.bincount(keys.argmax(axis=1), minlength=totals.shape[1])
+
+
+def simulate_field(shots_behind,
+                   sg_expect_round,
+                   holes_left,
+                   sims: int = DEFAULT_SIMS,
+                   rnd_sd: float = DEFAULT_RND_SD,
+                   rng=None,
+                   round_scores: bool = False,
+                   workers: int = None):
+    """
+    Jointly simulate every player in the field and return win probabilities
+    that sum to 1:
+      - shots_behind: per-player strokes behind the leader
+      - sg_expect_round: per-player projected SG for remaining holes
+      - holes_left: holes remaining (scalar or per player)
+      - round_scores: score whole strokes, so ties go to a playoff
+      - workers: shard sims over the process pool (see parallel.py)
+    Sims are processed in chunks of at most MAX_CHUNK_CELLS draws.
+    """
+    if workers is not None:
+        from parallel import parallel_field
+        return parallel_field(shots_behind, sg_expect_round, holes_left, sims=sims,
+                              rnd_sd=rnd_sd, seed=rng, round_scores=round_scores,
+                              workers=workers)
+    offset, sd_scale = field_params(shots_behind, sg_expect_round, holes_left, rnd_sd)
+    return count_field_wins(offset, sd_scale, sims, make_rng(rng), round_scores) / sims
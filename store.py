@@ -0,0 +1,338 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+    import msvcrt
+
+from scoring import NUMERIC_FIELDS, OUTPUT_FIELDS, FIELD_QUALITY
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+STORE_PATH  = os.environ.get("ODDS_APEX_STORE", "snapshots.snap")
+MAGIC       = b"OAGSNAP\x01"
+HEADER_SIZE = 16             # MAGIC + uint32 record size + uint32 reserved
+INDEX_BLOCK = 8192           # records summarised per sparse-index entry
+WRITE_BATCH = 4096           # max records gathered into one write()
+
+QUALITIES = list(FIELD_QUALITY)
+_CLOSE    = object()         # queue sentinel: flush and stop the writer
+
+# One fixed-width record per priced player snapshot
+OUTPUT_COLUMNS = [f for f in OUTPUT_FIELDS[1:] if f not in NUMERIC_FIELDS]
+RECORD_DTYPE = np.dtype(
+    [("event", "<i4"), ("player", "<i4"), ("timestamp", "<f8"), ("quality", "i1")]
+    + [(f, "<f4") for f in NUMERIC_FIELDS]
+    + [(f, "<f4") for f in OUTPUT_COLUMNS]
+)
+
+# ------------------------
+# METADATA
+# ------------------------
+# Event and player names live in a JSON sidecar (ids are list positions),
+# along with settled winners, which arrive long after the snapshots.
+
+def _meta_path(path: str) -> str:
+    return path + ".meta.json"
+
+
+def _read_meta(path: str) -> dict:
+    try:
+        with open(_meta_path(path), encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"events": [], "players": [], "winners": {}}
+
+
+def _write_meta(path: str, meta: dict):
+    tmp = _meta_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, _meta_path(path))
+
+
+def _lock_path(path: str) -> str:
+    return path + ".lock"
+
+
+def _acquire_lock(path: str):
+    """
+    Exclusive, non-blocking lock on `<path>.lock` (released by the OS if the
+    process dies). Raises RuntimeError if another writer holds it.
+    """
+    fh = open(_lock_path(path), "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        fh.close()
+        raise RuntimeError(f"{path} is already open for writing by another process") from None
+    return fh
+
+
+def _check_header(fh):
+    head = fh.read(HEADER_SIZE)
+    if head[:8] != MAGIC or int.from_bytes(head[8:12], "little") != RECORD_DTYPE.itemsize:
+        raise ValueError("not a snapshot store (or written with another record layout)")
+
+# ------------------------
+# WRITER
+# ------------------------
+
+class StoreWriter:
+    """
+    Append-only writer. `append` only builds the records and queues them;
+    a background thread batches queued records into single write() calls,
+    so pricing never waits on disk. One writer per store file, enforced
+    with a lock file (RuntimeError if the store is already open).
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lockfile = _acquire_lock(path)
+        self.meta = _read_meta(path)
+        self._ids = {k: {name: i for i, name in enumerate(self.meta[k])}
+                     for k in ("events", "players")}
+        self._meta_dirty = False
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as fh:
+                fh.write(MAGIC + RECORD_DTYPE.itemsize.to_bytes(4, "little") + bytes(4))
+        else:
+            with open(path, "rb") as fh:
+                _check_header(fh)
+            self._truncate_partial()
+        self._queue  = queue.SimpleQueue()
+        self._lock   = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, name="store-writer", daemon=True)
+        self._thread.start()
+
+    def _truncate_partial(self):
+        """Drop a torn trailing record left by a crash mid-write."""
+        size = os.path.getsize(self.path)
+        whole = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+        if whole != size:
+            os.truncate(self.path, whole)
+
+    def _id(self, kind: str, name: str) -> int:
+        ids = self._ids[kind]
+        i = ids.get(name)
+        if i is None:
+            with self._lock:
+                i = ids.get(name)
+                if i is None:
+                    i = ids[name] = len(self.meta[kind])
+                    self.meta[kind].append(name)
+                    self._meta_dirty = True
+        return i
+
+    def append(self, cols, results, event: str, timestamp: float = None):
+        """Queue one record per row of a to_columns/score_players pair."""
+        n = len(results["name"])
+        recs = np.zeros(n, dtype=RECORD_DTYPE)
+        recs["event"]     = self._id("events", str(event))
+        recs["player"]    = [self._id("players", name) for name in results["name"]]
+        recs["timestamp"] = time.time() if timestamp is None else timestamp
+        recs["quality"]   = [QUALITIES.index(q) for q in cols["quality"]]
+        for f in NUMERIC_FIELDS:
+            recs[f] = cols[f]
+        for f in OUTPUT_COLUMNS:
+            recs[f] = results[f]
+        self._queue.put(recs)
+
+    def settle(self, event: str, winner: str):
+        """Record an event's winner (read by backtests and calibration)."""
+        if str(event) not in self._ids["events"]:
+            raise ValueError(f"no snapshots recorded for event {event!r}")
+        if winner not in self._ids["players"]:
+            raise ValueError(f"no snapshots recorded for player {winner!r}")
+        with self._lock:
+            self.meta["winners"][str(event)] = winner
+            self._meta_dirty = True
+        self._queue.put(None)                  # wake the writer to save meta
+
+    def _drain(self):
+        with open(self.path, "ab") as fh:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < WRITE_BATCH:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                closing = any(b is _CLOSE for b in batch)
+                # names must be on disk before records that refer to them
+                if self._meta_dirty:
+                    with self._lock:
+                        self._meta_dirty = False
+                        meta = json.loads(json.dumps(self.meta))
+                    _write_meta(self.path, meta)
+                recs = [b for b in batch if isinstance(b, np.ndarray)]
+                if recs:
+                    fh.write(np.concatenate(recs).tobytes())
+                    fh.flush()
+                if closing:
+                    return
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread."""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._lockfile.close()
+
+# ------------------------
+# READER
+# ------------------------
+
+class SnapshotStore:
+    """
+    Zero-copy reader: `records` is a read-only memmap of every complete
+    record. `refresh()` picks up records appended since (safe while a writer
+    is running). A sparse index keeps (event, timestamp) ranges per
+    INDEX_BLOCK records so range queries only touch matching blocks; every
+    block holds the whole field, so players get their own index instead:
+    sorted record offsets per player id.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        with open(path, "rb") as fh:
+            _check_header(fh)
+        self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self._index = np.empty((0, 4))         # ev, timestamp (min, max) per block
+        self._by_player = {}                   # player id → [offset arrays], one per extension
+        self.refresh()
+
+    def refresh(self):
+        n = (os.path.getsize(self.path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if n != len(self.records):
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_SIZE, shape=(n,)) if n else self.records
+        self.meta = _read_meta(self.path)
+        self._extend_index()
+        return len(self.records)
+
+    def _extend_index(self):
+        full = len(self.records) // INDEX_BLOCK
+        done = len(self._index)
+        if full == done:
+            return
+        block = self.records[done * INDEX_BLOCK: full * INDEX_BLOCK]
+        ev = block["event"].reshape(-1, INDEX_BLOCK)
+        ts = block["timestamp"].reshape(-1, INDEX_BLOCK)
+        new = np.column_stack([ev.min(1), ev.max(1), ts.min(1), ts.max(1)])
+        self._index = np.vstack([self._index, new])
+        order = np.argsort(block["player"], kind="stable")     # stable: offsets stay ascending
+        pids, starts = np.unique(block["player"][order], return_index=True)
+        offsets = np.split(order + done * INDEX_BLOCK, starts[1:])
+        for pid, offs in zip(pids.tolist(), offsets):
+            self._by_player.setdefault(pid, []).append(offs)
+
+    def event_id(self, name: str) -> int:
+        return self.meta["events"].index(name)
+
+    def player_id(self, name: str) -> int:
+        return self.meta["players"].index(name)
+
+    def query(self, event: str = None, player: str = None, t0: float = None, t1: float = None):
+        """Records matching an event, player and/or [t0, t1] timestamp range."""
+        ev  = self.event_id(event) if event is not None else None
+        pid = self.player_id(player) if player is not None else None
+        lo  = -np.inf if t0 is None else t0
+        hi  = np.inf if t1 is None else t1
+
+        idx = self._index
+        tail = self.records[len(idx) * INDEX_BLOCK:]                   # unindexed tail
+        if pid is not None:
+            offs = self._by_player.get(pid, [])
+            chunks = [self.records[np.concatenate(offs)]] if offs else []
+        else:
+            keep = (idx[:, 2] <= hi) & (idx[:, 3] >= lo)
+            if ev is not None:
+                keep &= (idx[:, 0] <= ev) & (idx[:, 1] >= ev)
+            chunks = [self.records[b * INDEX_BLOCK:(b + 1) * INDEX_BLOCK]
+                      for b in np.flatnonzero(keep)]
+        chunks.append(tail)
+
+        out = []
+        for chunk in chunks:
+            mask = (chunk["timestamp"] >= lo) & (chunk["timestamp"] <= hi)
+            if ev is not None:
+                mask &= chunk["event"] == ev
+            if pid is not None:
+                mask &= chunk["player"] == pid
+            out.append(chunk[mask])
+        return np.concatenate(out) if out else np.empty(0, dtype=RECORD_DTYPE)
+
+    def columns(self, recs):
+        """to_columns-style dict (plus outputs, names and outcomes) for records."""
+        cols = {f: recs[f].astype(float) for f in NUMERIC_FIELDS + OUTPUT_COLUMNS}
+        players = np.asarray(self.meta["players"], dtype=object)
+        events  = np.asarray(self.meta["events"], dtype=object)
+        cols["name"]      = list(players[recs["player"]])
+        cols["event"]     = list(events[recs["event"]])
+        cols["quality"]   = [QUALITIES[q] for q in recs["quality"]]
+        cols["timestamp"] = recs["timestamp"].astype(float)
+        winners = self.meta["winners"]
+        cols["won"] = np.array([float(winners.get(e) == p) if e in winners else np.nan
+                                for e, p in zip(cols["event"], cols["name"])])
+        return cols
+
+    def iter_events(self):
+        """(event, row dicts sorted by time) for every settled event (backtest input)."""
+        for event in self.meta["winners"]:
+            if event not in self.meta["events"]:
+                continue
+            recs = self.query(event=event)
+            recs = recs[np.argsort(recs["timestamp"], kind="stable")]
+            cols = self.columns(recs)
+            keys = NUMERIC_FIELDS + ["name", "quality", "timestamp", "won", "event"]
+            yield event, [{k: cols[k][i] for k in keys} for i in range(len(recs))]
+
+# ------------------------
+# CLI
+# ------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot store maintenance.")
+    parser.add_argument("--store", default=STORE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    settle = sub.add_parser("settle", help="record the winner of an event")
+    settle.add_argument("event")
+    settle.add_argument("winner")
+    sub.add_parser("events", help="list events, snapshot counts and winners")
+    args = parser.parse_args(argv)
+
+    if args.command == "settle":
+        try:
+            writer = StoreWriter(args.store)
+        except (RuntimeError, ValueError) as exc:
+            parser.error(f"{exc} (settle from the running pricer, or stop it first)")
+        try:
+            writer.settle(args.event, args.winner)
+        except ValueError as exc:
+            parser.error(str(exc))
+        finally:
+            writer.close()
+        print(f"{args.event}: winner {args.winner}")
+    else:
+        store = SnapshotStore(args.store)
+        counts = np.bincount(store.records["event"], minlength=len(store.meta["events"]))
+        for i, event in enumerate(store.meta["events"]):
+            winner = store.meta["winners"].get(event, "-")
+            sys.stdout.write(f"{event:<24}{counts[i]:>10}  {winner}\n")
+
+
+if __name__ == "__main__":
+    main()
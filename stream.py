@@ -0,0 +1,112 @@
+import argparse
+import json
+import socket
+import sys
+
+from scoring import MAX_FAIR, OUTPUT_FIELDS, read_players
+
+# ------------------------
+# ODDS-TICK BOARD
+# ------------------------
+
+class OddsBoard:
+    """
+    Priced board that reacts to odds ticks.
+
+    `p_final` (form + leaderboard) is cached per player from a full
+    pricing run; a tick only recomputes the market-dependent fields
+    p_implied, edge, fair_odds and ev for that one player.
+    """
+
+    def __init__(self, rows):
+        self.rows = {}
+        for r in rows:
+            row = {f: r[f] if f == "name" else float(r[f]) for f in OUTPUT_FIELDS}
+            self.rows[row["name"]] = row
+
+    def apply(self, name: str, live_odds: float):
+        """
+        Update one player's market fields; return the row if it changed.
+        Scalar twin of scoring.market_outputs, kept in plain floats for speed.
+        """
+        row = self.rows.get(name)
+        if row is None or live_odds <= 1.0 or live_odds == row["live_odds"]:
+            return None
+        p_final = row["p_final"]
+        p_implied = 1.0 / live_odds
+        fair_model = min(1.0 / p_final, MAX_FAIR)
+        row["live_odds"] = live_odds
+        row["p_implied"] = p_implied
+        row["edge"]      = p_final - p_implied
+        row["fair_odds"] = 0.7 * fair_model + 0.3 * live_odds
+        row["ev"]        = p_final * (live_odds - 1) - (1 - p_final)
+        return row
+
+# ------------------------
+# FEED SOURCES
+# ------------------------
+
+def open_feed(spec: str):
+    """
+    Open a line-oriented tick feed:
+      - "-": stdin (pipe)
+      - "unix:/path/to.sock": local Unix socket
+      - "tcp:host:port": local TCP socket
+      - anything else: a JSONL file
+    """
+    if spec == "-":
+        return sys.stdin
+    if spec.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(spec[5:])
+        return sock.makefile("r", encoding="utf-8")
+    if spec.startswith("tcp:"):
+        host, port = spec[4:].rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+        return sock.makefile("r", encoding="utf-8")
+    return open(spec, encoding="utf-8")
+
+
+def run(board: OddsBoard, feed, out, flush: bool = True) -> int:
+    """Consume ticks from `feed`, emit changed rows to `out`. Returns ticks read."""
+    loads, dumps, apply, write = json.loads, json.dumps, board.apply, out.write
+    ticks = 0
+    for line in feed:
+        if not line.strip():
+            continue
+        ticks += 1
+        try:
+            tick = loads(line)
+            row  = apply(tick["name"], float(tick["live_odds"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+        if row is not None:
+            write(dumps(row) + "\n")
+            if flush:
+                out.flush()
+    out.flush()
+    return ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprice a board on live odds ticks.")
+    parser.add_argument("board", help="priced board from scoring.py (CSV/JSONL)")
+    parser.add_argument("feed", nargs="?", default="-",
+                        help="tick feed: file, '-', unix:/path or tcp:host:port")
+    parser.add_argument("--no-flush", action="store_true",
+                        help="buffer output instead of flushing each row")
+    args = parser.parse_args(argv)
+
+    fmt = "csv" if args.board.endswith(".csv") else "jsonl"
+    with open(args.board, newline="") as fh:
+        board = OddsBoard(read_players(fh, fmt))
+    feed = open_feed(args.feed)
+    try:
+        run(board, feed, sys.stdout, flush=not args.no_flush)
+    finally:
+        if feed is not sys.stdin:
+            feed.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from simulation import (
+    count_wins, norm_sf, norm_ppf, make_rng, _round_params,
+    DEFAULT_SIMS, DEFAULT_RND_SD, MAX_CHUNK_CELLS,
+)
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+VR_METHODS       = ("plain", "antithetic", "sobol", "conditional")
+CI_Z             = 1.959963984540054   # two-sided 95%
+SOBOL_REPLICATES = 8                   # independent scrambles for the QMC stderr
+ADAPTIVE_BATCH   = 4096
+ADAPTIVE_MAX     = 1_000_000
+TARGET_SE        = 0.001               # 0.1 percentage points
+
+
+class SimEstimate(NamedTuple):
+    p: float
+    stderr: float
+    ci_low: float
+    ci_high: float
+    sims: int
+
+# ------------------------
+# BATCH ESTIMATORS
+# ------------------------
+# Each returns (sum, sum of squares, i.i.d. samples, normal draws used) for
+# one batch, so batches can be pooled into a mean and its standard error.
+
+def _wins_rows(offset, sd_scale, z):
+    """Win indicator per row of a (rows, contenders) standard-normal matrix."""
+    return (offset + sd_scale * z[:, 0] <= sd_scale * z[:, 1:].min(axis=1)).astype(float)
+
+
+def _batch_plain(offset, sd_scale, contenders, n, rng):
+    w = count_wins(offset, sd_scale, contenders, n, rng)
+    return w, w, n, n
+
+
+def _batch_antithetic(offset, sd_scale, contenders, n, rng):
+    half = max(1, n // 2)
+    z = rng.standard_normal((half, contenders))
+    v = 0.5 * (_wins_rows(offset, sd_scale, z) + _wins_rows(offset, sd_scale, -z))
+    return v.sum(), (v * v).sum(), half, 2 * half
+
+
+def _batch_conditional(offset, sd_scale, contenders, n, rng):
+    """
+    Integrate the rivals' minimum out analytically: given your draw z,
+    P(win) = (1 − Φ(m + z))^(n−1), so only one normal per sim is needed.
+    """
+    z = rng.standard_normal(n)
+    with np.errstate(divide="ignore"):
+        v = np.exp((contenders - 1) * np.log(norm_sf(offset / sd_scale + z)))
+    return v.sum(), (v * v).sum(), n, n
+
+
+def _sobol_1d(points: int, rng):
+    """
+    The first `points` scrambled Sobol points in one dimension: the
+    bit-reversed (van der Corput) sequence with a random 32-bit digital
+    shift, so each replicate is an unbiased, still low-discrepancy point set
+    (fully balanced when `points` is a power of two).
+    """
+    i = np.arange(points, dtype=np.uint32)
+    i = ((i >> 1) & 0x55555555) | ((i & 0x55555555) << 1)
+    i = ((i >> 2) & 0x33333333) | ((i & 0x33333333) << 2)
+    i = ((i >> 4) & 0x0F0F0F0F) | ((i & 0x0F0F0F0F) << 4)
+    i = ((i >> 8) & 0x00FF00FF) | ((i & 0x00FF00FF) << 8)
+    i = (i >> 16) | (i << 16)
+    i ^= np.uint32(rng.integers(0, 1 << 32))
+    return (i.astype(float) + 0.5) / 2.0 ** 32
+
+
+def _batch_sobol(offset, sd_scale, contenders, n, rng):
+    """
+    One scrambled-Sobol replicate of n points, numpy only (callers pass
+    powers of two except for a last replicate capped at the budget). QMC is
+    applied to the conditional integrand (rivals' minimum integrated out),
+    so a single dimension carries all the randomness.
+    """
+    z = norm_ppf(_sobol_1d(n, rng))
+    with np.errstate(divide="ignore"):
+        v = np.exp((contenders - 1) * np.log(norm_sf(offset / sd_scale + z))).mean()
+    return v, v * v, 1, n
+
+
+_BATCH = {
+    "plain":       _batch_plain,
+    "antithetic":  _batch_antithetic,
+    "sobol":       _batch_sobol,
+    "conditional": _batch_conditional,
+}
+
+# ------------------------
+# ESTIMATION
+# ------------------------
+
+def _settled(offset, sd_scale, contenders):
+    """Closed-form answer when there is no randomness left, else None."""
+    if contenders <= 1:
+        return 1.0
+    if sd_scale <= 0:
+        return 1.0 if offset <= 0 else 0.0
+    return None
+
+
+def _pooled(total, total_sq, samples, draws, method) -> SimEstimate:
+    total, total_sq = float(total), float(total_sq)
+    p = total / samples
+    var = (total_sq - samples * p * p) / (samples - 1) if samples > 1 else float("inf")
+    se = math.sqrt(max(var, 0.0) / samples)
+    if method in ("plain", "antithetic"):
+        # zero/all hits would give se = 0; floor with a Jeffreys-style proportion
+        q = (total + 0.5) / (samples + 1)
+        se = max(se, math.sqrt(q * (1 - q) / draws))
+    return SimEstimate(p, se, max(0.0, p - CI_Z * se), min(1.0, p + CI_Z * se), draws)
+
+
+def _run(offset, sd_scale, contenders, method, batch, max_sims, target_se, rng):
+    if method not in _BATCH:
+        raise ValueError(f"unknown method {method!r}; expected one of {VR_METHODS}")
+    fn = _BATCH[method]
+    min_samples = 2 if method == "sobol" else 1
+    total = total_sq = 0.0
+    samples = draws = 0
+    while draws < max_sims:
+        n = min(batch, max_sims - draws)
+        s, sq, k, d = fn(offset, sd_scale, contenders, n, rng)
+        total, total_sq, samples, draws = total + s, total_sq + sq, samples + k, draws + d
+        if target_se is not None and samples >= min_samples:
+            if _pooled(total, total_sq, samples, draws, method).stderr <= target_se:
+                break
+    return _pooled(total, total_sq, samples, draws, method)
+
+
+def estimate_win_prob(shots_behind: float,
+                      holes_left: int,
+                      sg_expect_round: float,
+                      contenders: int = 20,
+                      sims: int = DEFAULT_SIMS,
+                      rnd_sd: float = DEFAULT_RND_SD,
+                      rng=None,
+                      method: str = "plain") -> SimEstimate:
+    """
+    Fixed-budget win probability with its standard error and 95% CI:
+      - method: "plain", "antithetic", "sobol" (scrambled 1-D QMC on the
+        conditional integrand) or "conditional" (rivals' minimum integrated out)
+    """
+    offset, sd_scale = _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd)
+    p = _settled(offset, sd_scale, contenders)
+    if p is not None:
+        return SimEstimate(p, 0.0, p, p, 0)
+    rng = make_rng(rng)
+    if method == "sobol":
+        batch = 1 << max(1, int(math.log2(max(2, sims // SOBOL_REPLICATES))))   # 2^k, budget-capped
+    else:
+        batch = max(1, MAX_CHUNK_CELLS // contenders)
+    return _run(offset, sd_scale, contenders, method, batch, sims, None, rng)
+
+
+def adaptive_win_prob(shots_behind: float,
+                      holes_left: int,
+                      sg_expect_round: float,
+                      contenders: int = 20,
+                      target_se: float = TARGET_SE,
+                      batch: int = ADAPTIVE_BATCH,
+                      max_sims: int = ADAPTIVE_MAX,
+                      rnd_sd: float = DEFAULT_RND_SD,
+                      rng=None,
+                      method: str = "conditional") -> SimEstimate:
+    """
+    Keep simulating in batches until the standard error reaches `target_se`
+    (or `max_sims` draws), and return the estimate, CI and sims used.
+    """
+    offset, sd_scale = _round_params(shots_behind, holes_left, sg_expect_round, rnd_sd)
+    p = _settled(offset, sd_scale, contenders)
+    if p is not None:
+        return SimEstimate(p, 0.0, p, p, 0)
+    return _run(offset, sd_scale, contenders, method, batch, max_sims, target_se, make_rng(rng))
+
+
+def adaptive_win_probs(shots_behind, holes_left, sg_expect_round, contenders,
+                       target_se: float = TARGET_SE,
+                       max_sims: int = ADAPTIVE_MAX,
+                       rnd_sd: float = DEFAULT_RND_SD,
+                       rng=None,
+                       method: str = "conditional"):
+    """
+    adaptive_win_prob for every row of the (broadcast) inputs from one
+    Generator. Returns a dict of arrays: p, stderr, ci_low, ci_high, sims.
+    """
+    rows = np.broadcast_arrays(np.asarray(shots_behind, float), np.asarray(holes_left, float),
+                               np.asarray(sg_expect_round, float), np.asarray(contenders, int))
+    rng = make_rng(rng)
+    est = [adaptive_win_prob(sb, hl, sg, int(n), target_se=target_se, max_sims=max_sims,
+                             rnd_sd=rnd_sd, rng=rng, method=method)
+           for sb, hl, sg, n in zip(*(r.ravel() for r in rows))]
+    return {f: np.array([getattr(e, f) for e in est]) for f in SimEstimate._fields}
@@ -0,0 +1,182 @@
+import argparse
+import json
+import sys
+from itertools import product
+
+import numpy as np
+
+from scoring import (to_columns, read_players, score_players, load_calibration, _guess_format,
+                     TOTAL_HOLES)
+from simulation import (project_sg_remaining, simulate_win_probs, _round_params, make_rng,
+                        MAX_CHUNK_CELLS, DEFAULT_RND_SD, SIM_MODES)
+
+# ------------------------
+# CONFIGURATION / GLOBALS
+# ------------------------
+
+SB_DELTAS = (-2, -1, 0, 1, 2)      # shots_behind changes (−1 = you birdie / leader bogeys)
+HL_DELTAS = (0, 1, 2, 3)           # holes played from now (holes_left − n)
+SG_DELTAS = (0.0,)                 # shifts of the expected SG per round
+WHATIF_SIMS = 200_000              # shared draws make large sim counts cheap
+
+TABLE_FIELDS = ("p_final", "ev", "edge", "p_sim")
+
+# ------------------------
+# COMMON RANDOM NUMBERS
+# ------------------------
+# You win when offset + sd·z₀ ≤ sd·min(z₁…) ⇔ z₀ − min(z₁…) ≤ −offset/sd, so
+# one sorted vector of margins D = z₀ − min(z₁…) per contender count prices
+# every scenario by a binary search. All scenarios see the same draws.
+
+def crn_margins(contenders: int, sims: int, rng: np.random.Generator):
+    """Sorted standardized margins z₀ − min(rivals) for `sims` shared draws."""
+    if contenders <= 1:
+        return np.full(sims, -np.inf)
+    rows = max(1, MAX_CHUNK_CELLS // contenders)
+    out = np.empty(sims)
+    for start in range(0, sims, rows):
+        z = rng.standard_normal((min(rows, sims - start), contenders))
+        out[start:start + len(z)] = z[:, 0] - z[:, 1:].min(axis=1)
+    out.sort()
+    return out
+
+
+def crn_win_probs(offset, sd_scale, contenders, sims: int, rng):
+    """Win probabilities for many (offset, sd, contenders) off shared margins."""
+    offset, sd_scale = np.asarray(offset, float), np.asarray(sd_scale, float)
+    contenders = np.asarray(contenders, int)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = np.where(sd_scale > 0, -offset / sd_scale, np.where(offset <= 0, np.inf, -np.inf))
+    p = np.empty(len(m))
+    for n in np.unique(contenders):
+        rows = contenders == n
+        margins = crn_margins(int(n), sims, rng)
+        p[rows] = np.searchsorted(margins, m[rows], side="right") / sims
+    return p
+
+# ------------------------
+# SCENARIO GRID
+# ------------------------
+
+def scenario_grid(sb_deltas=SB_DELTAS, hl_deltas=HL_DELTAS, sg_deltas=SG_DELTAS):
+    """(S, 3) array of (holes played, sg shift, shots_behind change) scenarios."""
+    return np.array(list(product(hl_deltas, sg_deltas, sb_deltas)), dtype=float)
+
+
+def what_if(cols,
+            sb_deltas=SB_DELTAS,
+            hl_deltas=HL_DELTAS,
+            sg_deltas=SG_DELTAS,
+            mode: str = "mc",
+            sims: int = WHATIF_SIMS,
+            rng=None,
+            rnd_sd: float = DEFAULT_RND_SD):
+    """
+    Price every player under every scenario in one batched pass. Returns
+    the scenario grid and score_players columns of shape (players, S).
+    Scenarios that would leave fewer than one hole are NaN.
+
+    "mc" uses common random numbers, so neighbouring scenarios differ only
+    by the change itself; exact/grid are deterministic anyway.
+    """
+    grid = scenario_grid(sb_deltas, hl_deltas, sg_deltas)
+    n, s = len(cols["name"]), len(grid)
+    idx = np.repeat(np.arange(n), s)
+    scen = {k: (v[idx] if isinstance(v, np.ndarray) else [v[i] for i in idx])
+            for k, v in cols.items()}
+    dhl, dsg, dsb = (np.tile(grid[:, j], n) for j in range(3))
+    scen["shots_behind"] = scen["shots_behind"] + dsb
+    scen["holes_left"]   = scen["holes_left"] - dhl
+    valid = scen["holes_left"] >= 1
+    scen["holes_left"]   = np.maximum(scen["holes_left"], 1)
+
+    sg = project_sg_remaining(scen["sg_expected"], scen["sg_off_tee"], scen["sg_approach"],
+                              scen["sg_putting"], scen["holes_left"], total_holes=TOTAL_HOLES) + dsg
+    if mode == "mc":
+        offset, sd = _round_params(scen["shots_behind"], scen["holes_left"], sg, rnd_sd)
+        p_sim = crn_win_probs(offset, sd, scen["n_contenders"].astype(int), sims, make_rng(rng))
+    else:
+        p_sim = simulate_win_probs(scen["shots_behind"], scen["holes_left"].astype(int), sg,
+                                   scen["n_contenders"].astype(int), sims=sims, rnd_sd=rnd_sd,
+                                   rng=rng, mode=mode)
+
+    res = score_players(scen, p_sim=p_sim)
+    out = {"name": cols["name"], "grid": grid}
+    for f in ("score", "p_model", "p_sim", "p_final", "p_implied", "edge", "fair_odds", "ev"):
+        out[f] = np.where(valid, res[f], np.nan).reshape(n, s)
+    return out
+
+# ------------------------
+# OUTPUT
+# ------------------------
+
+def format_tables(wi, cols, field: str = "p_final"):
+    """Compact per-player table: rows (holes played, sg shift), columns Δshots_behind."""
+    grid = wi["grid"]
+    sb = np.unique(grid[:, 2])
+    rows = [tuple(r) for r in np.unique(grid[:, :2], axis=0)]
+    pct = field != "ev"
+    lines = []
+    for i, name in enumerate(wi["name"]):
+        base = (grid[:, 0] == 0) & (grid[:, 1] == 0) & (grid[:, 2] == 0)
+        head = f"{name}  (sb {cols['shots_behind'][i]:g}, holes {cols['holes_left'][i]:g}, " \
+               f"odds {cols['live_odds'][i]:.2f}"
+        if base.any():
+            head += f", {field} {_cell(wi[field][i, base][0], pct).strip()}"
+        lines.append(head + ")")
+        lines.append(f"{'played':>7}{'sg±':>6}" + "".join(f"{'sb' + format(d, '+g'):>9}" for d in sb))
+        for dhl, dsg in rows:
+            cells = [wi[field][i, (grid[:, 0] == dhl) & (grid[:, 1] == dsg) & (grid[:, 2] == d)][0]
+                     for d in sb]
+            lines.append(f"{dhl:>7g}{dsg:>+6.2f}" + "".join(_cell(v, pct) for v in cells))
+        lines.append("")
+    return lines
+
+
+def _cell(v, pct):
+    if np.isnan(v):
+        return f"{'-':>9}"
+    return f"{v * 100:>8.2f}%" if pct else f"{v:>+9.3f}"
+
+
+def iter_scenarios(wi):
+    """One dict per (player, scenario) for JSONL output."""
+    for i, name in enumerate(wi["name"]):
+        for j, (dhl, dsg, dsb) in enumerate(wi["grid"]):
+            yield {"name": name, "holes_played": dhl, "sg_shift": dsg, "sb_change": dsb,
+                   **{f: float(wi[f][i, j]) for f in ("p_sim", "p_final", "edge", "ev")}}
+
+
+def _floats(text):
+    return tuple(float(x) for x in text.split(","))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="What-if grids over shots behind, holes left and SG.")
+    parser.add_argument("input", help="players CSV/JSONL ('-' for stdin)")
+    parser.add_argument("--in-format", choices=["csv", "jsonl"])
+    parser.add_argument("--sb", type=_floats, default=SB_DELTAS, help="shots_behind changes, e.g. -2,-1,0,1,2")
+    parser.add_argument("--holes", type=_floats, default=HL_DELTAS, help="holes played, e.g. 0,1,2,3")
+    parser.add_argument("--sg", type=_floats, default=SG_DELTAS, help="SG-per-round shifts, e.g. -0.5,0,0.5")
+    parser.add_argument("--mode", choices=SIM_MODES, default="mc")
+    parser.add_argument("--sims", type=int, default=WHATIF_SIMS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--field", choices=TABLE_FIELDS, default="p_final")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text")
+    args = parser.parse_args(argv)
+    load_calibration()
+
+    fmt = args.in_format or _guess_format(args.input, "csv")
+    fin = sys.stdin if args.input == "-" else open(args.input, newline="")
+    with fin:
+        cols = to_columns(read_players(fin, fmt))
+    wi = what_if(cols, args.sb, args.holes, args.sg, args.mode, args.sims, make_rng(args.seed))
+    if args.format == "jsonl":
+        for row in iter_scenarios(wi):
+            sys.stdout.write(json.dumps(row) + "\n")
+    else:
+        print("\n".join(format_tables(wi, cols, args.field)))
+
+
+if __name__ == "__main__":
+    main()